@@ -80,17 +80,28 @@ export default async function handler(req, res) {
       let subsObj;
       try {
         subsObj = JSON.parse(decoded || '{"emails": []}');
+        if (Array.isArray(subsObj)) subsObj = { emails: subsObj };
       } catch {
         subsObj = { emails: [] };
       }
 
-      // 2) Modify subscriber set
+      // 2) Modify subscriber set. Other keys (the "subscribers" preference
+      // records) are kept; unsubscribing removes the address from both lists.
+      const address = email.toLowerCase();
       const set = new Set((subsObj.emails || []).map(e => e.toLowerCase()));
-      if (action === "subscribe") set.add(email.toLowerCase());
-      else if (action === "unsubscribe") set.delete(email.toLowerCase());
+      const newObj = { ...subsObj };
+      if (action === "subscribe") set.add(address);
+      else if (action === "unsubscribe") {
+        set.delete(address);
+        if (Array.isArray(subsObj.subscribers)) {
+          newObj.subscribers = subsObj.subscribers.filter(
+            rec => ((rec && rec.email) || "").trim().toLowerCase() !== address
+          );
+        }
+      }
       else return res.status(400).json({ message: "Invalid action" });
 
-      const newObj = { emails: Array.from(set) };
+      newObj.emails = Array.from(set);
       const newContentBase64 = Buffer.from(JSON.stringify(newObj, null, 2), "utf8").toString("base64");
 
       // 3) Attempt to PUT
@@ -0,0 +1,244 @@
+import os
+import sys
+import gzip
+import json
+import bisect
+import hashlib
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from item import json_default
+from preferences import normalize_platform
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8766"))
+# Change sets kept for /changes; older cursors are told to resync from /drops.
+CHANGE_LOG_FILE = os.getenv("CHANGE_LOG_FILE", "change_log.json")
+CHANGE_LOG_KEEP = int(os.getenv("CHANGE_LOG_KEEP", "200"))
+# Standalone mode: how often the data files are checked for a new run.
+API_RELOAD_SECONDS = float(os.getenv("API_RELOAD_SECONDS", "5"))
+# Bodies smaller than this are not worth compressing.
+GZIP_MIN_BYTES = 512
+
+
+def append_change_set(log: dict, events: list, at: str, keep: int = CHANGE_LOG_KEEP) -> dict:
+    """
+    The change log with one more run: the version goes up by one and the
+    run's events are kept under it, dropping the oldest sets past `keep`.
+    """
+    version = int((log or {}).get("version") or 0) + 1
+    sets = list((log or {}).get("sets") or [])
+    sets.append({"version": version, "at": at, "events": events})
+    return {"version": version, "sets": sets[-keep:]}
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8")
+
+
+class Body:
+    """One response body, with its gzip form and ETag computed once."""
+    __slots__ = ("raw", "gz", "etag")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self.gz = gzip.compress(raw, compresslevel=6, mtime=0) if len(raw) >= GZIP_MIN_BYTES else None
+        self.etag = '"' + hashlib.sha256(raw).hexdigest()[:16] + '"'
+
+
+class Snapshot:
+    """
+    Everything the API answers for one version, built when the version is
+    published and never modified, so request threads read it without locks.
+    """
+
+    def __init__(self, version: int, grouped: dict, sets: list):
+        self.version = version
+        self.drops = Body(_encode([it for items in grouped.values() for it in items]))
+        self.platforms = {normalize_platform(src): Body(_encode(items)) for src, items in grouped.items()}
+        self.empty = Body(b"[]")
+        self.sets = tuple(sets)
+        self.set_versions = [s["version"] for s in self.sets]
+        # /changes bodies by cursor; at most one per retained set plus two.
+        self._changes = {}
+
+    def platform(self, name: str) -> Body:
+        return self.platforms.get(normalize_platform(name), self.empty)
+
+    def _cursor(self, since: int) -> int:
+        """
+        `since` itself when it can be answered from the ring buffer, else -1
+        (resync). A cursor ahead of the version comes from an earlier
+        history (the change log was lost and counting started over).
+        """
+        if since > self.version:
+            return -1
+        if since == self.version:
+            return since
+        oldest = self.set_versions[0] if self.sets else self.version + 1
+        return -1 if since < 0 or since < oldest - 1 else since
+
+    def changes_since(self, since: int) -> dict:
+        """
+        Change sets after `since`. A cursor older than the ring buffer, or
+        newer than the current version, gets reset=True: refetch /drops instead.
+        """
+        cursor = self._cursor(since)
+        if cursor < 0:
+            return {"version": self.version, "reset": True, "changes": []}
+        start = bisect.bisect_right(self.set_versions, cursor)
+        return {"version": self.version, "changes": list(self.sets[start:])}
+
+    def changes_body(self, since: int) -> Body:
+        cursor = self._cursor(since)
+        body = self._changes.get(cursor)
+        if body is None:
+            body = self._changes[cursor] = Body(_encode(self.changes_since(cursor)))
+        return body
+
+
+class DropsState:
+    """
+    The current Snapshot plus the ring buffer of recent change sets.
+    update() builds the next snapshot aside and swaps it in whole.
+    """
+
+    def __init__(self, keep: int = CHANGE_LOG_KEEP):
+        self.sets = deque(maxlen=keep)
+        self.snapshot = Snapshot(0, {}, ())
+        self.lock = threading.Lock()
+
+    def update(self, grouped: dict, log: dict):
+        with self.lock:
+            version = int((log or {}).get("version") or 0)
+            known = self.sets[-1]["version"] if self.sets else 0
+            if version < known:
+                # The log was started over; old cursors will be told to resync.
+                self.sets.clear()
+                known = 0
+            for s in (log or {}).get("sets") or []:
+                if s["version"] > known:
+                    self.sets.append(s)
+            self.snapshot = Snapshot(version, grouped, self.sets)
+
+
+def make_handler(state: DropsState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without this, small
+        # keep-alive responses wait out the client's delayed ACK.
+        disable_nagle_algorithm = True
+
+        def _send(self, status, body: Body = None, version=None):
+            gz = body is not None and body.gz is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            if version is not None:
+                self.send_header("X-Drops-Version", str(version))
+            payload = b""
+            if body is not None:
+                self.send_header("ETag", body.etag)
+                if status == 200:
+                    payload = body.gz if gz else body.raw
+                    if gz:
+                        self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            if payload:
+                self.wfile.write(payload)
+
+        def _error(self, status, message):
+            body = _encode({"error": message})
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            snap = state.snapshot
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            if parts.path == "/drops":
+                platform = (query.get("platform") or [""])[0]
+                body = snap.platform(platform) if platform else snap.drops
+            elif parts.path == "/changes":
+                try:
+                    since = int((query.get("since") or [""])[0])
+                except ValueError:
+                    self._error(400, "since must be a version number")
+                    return
+                body = snap.changes_body(since)
+            else:
+                self._error(404, "not found")
+                return
+            status = 304 if self.headers.get("If-None-Match") == body.etag else 200
+            self._send(status, body, snap.version)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(state: DropsState, host=API_HOST, port=API_PORT):
+    """Starts the API on a background thread; returns the server (shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="api-http", daemon=True).start()
+    print(f"[API] Serving /drops, /changes?since=<version> on http://{host}:{server.server_address[1]}")
+    return server
+
+
+def _load(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def watch_files(state: DropsState, data_path: str, log_path: str, stop: threading.Event,
+                interval=API_RELOAD_SECONDS):
+    """Standalone mode: reloads the state whenever a run has rewritten the data files."""
+    seen = None
+    while not stop.is_set():
+        try:
+            stamp = tuple(os.stat(p).st_mtime_ns for p in (data_path, log_path) if os.path.exists(p))
+        except OSError:
+            stamp = seen
+        if stamp != seen:
+            seen = stamp
+            state.update(_load(data_path, {}), _load(log_path, {}))
+            print(f"[API] Loaded version {state.snapshot.version}")
+        stop.wait(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the current drops and recent changes over HTTP.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--data", default="game_data.json", help="grouped snapshot written by main.py")
+    parser.add_argument("--log", default=CHANGE_LOG_FILE, help="change log written by main.py")
+    args = parser.parse_args(argv)
+
+    state = DropsState()
+    stop = threading.Event()
+    server = serve(state, args.host, args.port)
+    try:
+        watch_files(state, args.data, args.log, stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
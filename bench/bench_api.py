@@ -0,0 +1,138 @@
+"""
+Load benchmark for the read API (api_server.py): client processes hammer
+/drops (full, gzip, conditional, per platform) and /changes on keep-alive
+connections and report requests per second and latency percentiles per
+endpoint. By default a server is started here on synthetic data; --url
+points the clients at one already running (e.g. the daemon's).
+
+    python bench/bench_api.py --drops 2000 --clients 8 --duration 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import http.client
+from multiprocessing import Pool
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import api_server  # noqa: E402
+
+PLATFORMS = ["Epic Games Store", "GOG", "Steam", "Humble", "Ubisoft", "Prime Gaming"]
+
+
+def synthetic_state(drops, sets, events_per_set=5):
+    grouped = {p: [] for p in PLATFORMS}
+    for i in range(drops):
+        p = PLATFORMS[i % len(PLATFORMS)]
+        grouped[p].append({
+            "platform": p, "title": f"{p} Game {i}", "status": "Free Now",
+            "banner": f"img/{i:08x}-220.webp", "link": f"https://example.com/{p[:4].lower()}/{i}",
+            "ends_at": "2031-01-08T15:00:00Z",
+        })
+    log = {}
+    for v in range(sets):
+        events = [{"event": "new", "key": f"Steam|https://example.com/steam/{v}-{e}", "platform": "Steam",
+                   "title": f"Steam Game {v}-{e}", "link": "", "line": f"🟢 New Freebie: <b>Steam</b> – {v}-{e}"}
+                  for e in range(events_per_set)]
+        log = api_server.append_change_set(log, events, "2026-01-01T00:00:00Z")
+    return grouped, log
+
+
+def request_mix(version, etag):
+    """(label, path, headers) rotation the clients walk through."""
+    return [
+        ("drops 304", "/drops", {"If-None-Match": etag}),
+        ("drops gzip", "/drops", {"Accept-Encoding": "gzip"}),
+        ("drops plain", "/drops", {}),
+        ("platform", "/drops?platform=steam", {"Accept-Encoding": "gzip"}),
+        ("changes now", f"/changes?since={version}", {}),
+        ("changes -5", f"/changes?since={max(version - 5, 0)}", {"Accept-Encoding": "gzip"}),
+        ("changes now", f"/changes?since={version}", {}),
+        ("drops 304", "/drops", {"If-None-Match": etag}),
+    ]
+
+
+def client(args):
+    url, duration, mix = args
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    latencies = {}
+    deadline = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < deadline:
+        label, path, headers = mix[i % len(mix)]
+        i += 1
+        t0 = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        latencies.setdefault(label, []).append(time.perf_counter() - t0)
+        if resp.status not in (200, 304):
+            raise RuntimeError(f"{path}: HTTP {resp.status}")
+    conn.close()
+    return latencies
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark a running API instead of starting one")
+    parser.add_argument("--drops", type=int, default=1000, help="synthetic drops in the snapshot")
+    parser.add_argument("--sets", type=int, default=50, help="synthetic change sets in the ring buffer")
+    parser.add_argument("--clients", type=int, default=4, help="client processes, one connection each")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of load")
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if not url:
+        state = api_server.DropsState()
+        grouped, log = synthetic_state(args.drops, args.sets)
+        state.update(grouped, log)
+        server = api_server.serve(state, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+    conn.request("GET", "/drops")
+    resp = conn.getresponse()
+    body = resp.read()
+    version, etag = int(resp.getheader("X-Drops-Version") or 0), resp.getheader("ETag")
+    conn.close()
+    print(f"Snapshot version {version}: {len(json.loads(body))} drops, {len(body)} bytes")
+
+    mix = request_mix(version, etag)
+    try:
+        with Pool(args.clients) as pool:
+            t0 = time.perf_counter()
+            results = pool.map(client, [(url, args.duration, mix[i:] + mix[:i]) for i in range(args.clients)])
+            elapsed = time.perf_counter() - t0
+    finally:
+        if server:
+            server.shutdown()
+
+    merged = {}
+    for latencies in results:
+        for label, values in latencies.items():
+            merged.setdefault(label, []).extend(values)
+    everything = [v for values in merged.values() for v in values]
+    print(f"{len(everything)} requests in {elapsed:.1f}s with {args.clients} clients: "
+          f"{len(everything) / elapsed:.0f} req/s")
+    print(f"{'endpoint':<12} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, values in sorted(merged.items()) + [("all", everything)]:
+        print(f"{label:<12} {len(values):>7} {statistics.median(values) * 1e3:>8.2f} "
+              f"{percentile(values, 0.99) * 1e3:>8.2f} {max(values) * 1e3:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Parse-path benchmark for every scraper.
+
+Each (source, size) runs in a fresh interpreter so peak RSS is its own.
+Reported per run: median parse time, items produced, tracemalloc peak
+(bytes allocated by Python while parsing) and the process's peak RSS.
+Every run also parses once more with PARSE_ONLY off and fails if the
+strained parse returned anything different from the full-page one.
+
+    python bench/bench_parse.py                       # synthetic 100 / 1k / 10k cards
+    python bench/bench_parse.py --sizes 10000 --sources steamdb,prime
+    python bench/bench_parse.py --fixtures fixtures   # pages recorded with HTTP_RECORD
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import statistics
+import subprocess
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import synth  # noqa: E402
+
+# Recorded page each source's parser reads when benchmarking fixtures.
+FIXTURE_URLS = {
+    "egs": synth._url(synth.EGS_URL, {"locale": "en-US", "country": "IN", "allowCountries": "IN"}),
+    "gog": synth._url(synth.GOG_URL, {"limit": 48, "page": 1, "order": "desc:popularity",
+                                      "price": "free", "productType": "GAME", "countryCode": "IN"}),
+    "steamdb": synth.STEAMDB_URL,
+    "humble": synth.HUMBLE_URL.format(page=1),
+    "ubisoft": synth.UBISOFT_URL,
+    "prime": synth.PRIME_URL,
+}
+JSON_SOURCES = {"egs", "gog"}
+
+
+def rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def count_items(result):
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return sum(len(x) for x in result) if isinstance(result[1], list) else len(result[0])
+    return len(result)
+
+
+def comparable(result) -> str:
+    """
+    A parse result as JSON for comparing strained and full parses. ends_at is
+    left out: Prime derives it from "Ends in N days" and the clock, so two
+    parses a second apart would differ on it.
+    """
+    def strip(value):
+        if isinstance(value, (list, tuple)):
+            return [strip(v) for v in value]
+        if isinstance(value, dict) or hasattr(value, "to_dict"):
+            return {k: v for k, v in dict(value).items() if k != "ends_at"}
+        return value
+    return json.dumps(strip(result), sort_keys=True, default=str)
+
+
+def run_one(source, size, repeats, fixtures=None):
+    import main
+
+    if fixtures:
+        import replay
+        record = replay.load_fixture(fixtures, "GET", FIXTURE_URLS[source])
+        if record is None:
+            return {"source": source, "size": "fixture", "error": "no fixture recorded"}
+        payload = record["body"].decode("utf-8", "replace")
+        if source in JSON_SOURCES:
+            payload = json.loads(payload)
+    else:
+        payload = synth.PAYLOADS[source][0](size)
+    parse = getattr(main, synth.PAYLOADS[source][1])
+    rss_before = rss_mb()
+
+    times = []
+    result = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = parse(payload)
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    parse(payload)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    strained = main.PARSE_ONLY
+    main.PARSE_ONLY = False
+    try:
+        full = parse(payload)
+    finally:
+        main.PARSE_ONLY = strained
+    same = comparable(result) == comparable(full)
+
+    return {
+        "source": source,
+        "size": size if not fixtures else "fixture",
+        "items": count_items(result),
+        "parse_ms": round(statistics.median(times) * 1000, 2),
+        "per_item_us": round(statistics.median(times) * 1e6 / max(1, count_items(result)), 2),
+        "alloc_peak_mb": round(traced_peak / (1024 * 1024), 2),
+        "rss_peak_mb": round(rss_mb(), 1),
+        "rss_parse_mb": round(rss_mb() - rss_before, 1),
+        "matches_full_parse": same,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", default=",".join(synth.PAYLOADS))
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--fixtures", help="benchmark recorded pages from this fixture directory")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--one", nargs=2, metavar=("SOURCE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.one:
+        print(json.dumps(run_one(args.one[0], int(args.one[1]), args.repeats, args.fixtures)))
+        return 0
+
+    sizes = [0] if args.fixtures else [int(s) for s in args.sizes.split(",")]
+    rows = []
+    mismatches = 0
+    for source in args.sources.split(","):
+        for size in sizes:
+            cmd = [sys.executable, os.path.abspath(__file__), "--one", source, str(size),
+                   "--repeats", str(args.repeats)]
+            if args.fixtures:
+                cmd += ["--fixtures", args.fixtures]
+            out = subprocess.run(cmd, capture_output=True, text=True)
+            lines = out.stdout.strip().splitlines()
+            try:
+                row = json.loads(lines[-1])
+            except (IndexError, ValueError):
+                row = {"source": source, "size": size, "error": out.stderr.strip()[-300:]}
+            rows.append(row)
+            if "error" in row:
+                print(f"{source:<8} {row['size']!s:>8}  error: {row['error']}")
+            else:
+                print(f"{row['source']:<8} {row['size']!s:>8} items={row['items']:<6} "
+                      f"parse={row['parse_ms']:>9.2f}ms ({row['per_item_us']:>7.2f}us/item) "
+                      f"alloc_peak={row['alloc_peak_mb']:>7.2f}MB rss_peak={row['rss_peak_mb']:>7.1f}MB "
+                      f"(+{row['rss_parse_mb']}MB)")
+                if not row["matches_full_parse"]:
+                    mismatches += 1
+                    print(f"{'':>17}MISMATCH: strained parse differs from the full-page parse")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
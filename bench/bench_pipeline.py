@@ -0,0 +1,105 @@
+"""
+End-to-end benchmark: the whole main() pipeline against a local replay
+server serving synthetic pages of --cards cards per source (or a directory
+of recorded fixtures). Runs in a scratch directory, so nothing in the repo
+is touched. The second run of each size is the steady state, where nothing
+changed and nothing should be written or sent.
+
+    python bench/bench_pipeline.py --cards 100,1000,10000
+    python bench/bench_pipeline.py --fixtures fixtures
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+import synth  # noqa: E402
+import replay  # noqa: E402
+
+
+def run_child(workdir, server_url, runs):
+    """Runs main() `runs` times in this interpreter; prints one JSON line per run."""
+    os.chdir(workdir)
+    os.environ["HTTP_REPLAY"] = server_url
+    import main
+    for i in range(runs):
+        t0 = time.perf_counter()
+        main.main([])
+        elapsed = time.perf_counter() - t0
+        data = main.load_json(main.DATA_FILE, {})
+        print("BENCH " + json.dumps({
+            "run": i + 1,
+            "seconds": round(elapsed, 3),
+            "drops": sum(len(v) for v in data.values()),
+            "rss_peak_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }), flush=True)
+
+
+def bench(fixtures_dir, label, runs, verbose):
+    workdir = tempfile.mkdtemp(prefix="fgn-bench-")
+    try:
+        os.makedirs(os.path.join(workdir, "dashboard"))
+        for name in ("template_dashboard.html", "dashboard.js", "style.css"):
+            shutil.copy(os.path.join(ROOT, "dashboard", name), os.path.join(workdir, "dashboard", name))
+        server = replay.ReplayServer(fixtures_dir).start()
+        try:
+            cmd = [sys.executable, os.path.abspath(__file__), "--child", workdir, server.url, str(runs)]
+            env = dict(os.environ, TELEGRAM_BOT_TOKEN="PLACEHOLDER", PYTHONUNBUFFERED="1")
+            t0 = time.perf_counter()
+            out = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            total = time.perf_counter() - t0
+        finally:
+            server.stop()
+        if verbose or out.returncode:
+            print(out.stdout, out.stderr, sep="\n")
+        for line in out.stdout.splitlines():
+            if line.startswith("BENCH "):
+                row = json.loads(line[6:])
+                print(f"{label:>10} run {row['run']}: {row['seconds']:>7.2f}s drops={row['drops']:<6} "
+                      f"rss_peak={row['rss_peak_mb']:.1f}MB")
+        misses = sorted(set(server.misses))
+        print(f"{label:>10} process total {total:.2f}s; replay hits={server.hits} misses={len(misses)}")
+        for url in misses[:5]:
+            print(f"{'':>12}no fixture: {url}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", default="100,1000,10000", help="synthetic cards per source")
+    parser.add_argument("--fixtures", help="replay this recorded fixture directory instead")
+    parser.add_argument("--runs", type=int, default=2, help="consecutive runs per size")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the pipeline's own output")
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child[0], args.child[1], int(args.child[2]))
+        return 0
+
+    if args.fixtures:
+        bench(os.path.abspath(args.fixtures), "fixtures", args.runs, args.verbose)
+        return 0
+    for n in (int(c) for c in args.cards.split(",")):
+        fixtures = tempfile.mkdtemp(prefix="fgn-fixtures-")
+        try:
+            synth.write_run_fixtures(fixtures, n)
+            bench(fixtures, f"{n} cards", args.runs, args.verbose)
+        finally:
+            shutil.rmtree(fixtures, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Steam enrichment against a local stub of the store API: a cold run over
+--apps appids, a warm run over the same ones (which should make no calls),
+and a run where --churn of them are new. The stub answers any GetItems
+call with synthetic metadata after --latency seconds, so batching and the
+worker limit show up in the timings.
+
+    python bench/bench_steam_store.py --apps 2000 --latency 0.2
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import synth  # noqa: E402
+from http_client import HttpClient  # noqa: E402
+from steam_store import SteamStore  # noqa: E402
+
+
+class StubStore:
+    """IStoreBrowseService/GetItems stand-in that counts calls and tracks concurrency."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.ids = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if not parts.path.endswith("/IStoreBrowseService/GetItems/v1"):
+                    self.send_error(404)
+                    return
+                request = json.loads(parse_qs(parts.query)["input_json"][0])
+                appids = [str(i["appid"]) for i in request["ids"]]
+                with stub.lock:
+                    stub.calls += 1
+                    stub.ids += len(appids)
+                    stub.in_flight += 1
+                    stub.peak = max(stub.peak, stub.in_flight)
+                try:
+                    time.sleep(stub.latency)
+                    body = json.dumps(synth.steam_items_json(appids)).encode("utf-8")
+                finally:
+                    with stub.lock:
+                        stub.in_flight -= 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="stub-store", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def run(label, stub, workdir, appids, **store_args):
+    calls, ids = stub.calls, stub.ids
+    stub.peak = 0
+    store = SteamStore(HttpClient(cache_dir=os.path.join(workdir, "http")),
+                       path=os.path.join(workdir, "steam_app_cache.json"), base_url=stub.url, **store_args)
+    items = [{"platform": "Steam", "title": f"Steam Game {a}", "banner": "", "appid": a} for a in appids]
+    t0 = time.perf_counter()
+    store.enrich(items)
+    store.save()
+    elapsed = time.perf_counter() - t0
+    enriched = sum(1 for it in items if it.get("banner"))
+    print(f"{label:>6}: {elapsed:>6.2f}s calls={stub.calls - calls:<4} ids_fetched={stub.ids - ids:<6} "
+          f"peak_in_flight={stub.peak} enriched={enriched}/{len(items)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apps", type=int, default=1000, help="appids per run")
+    parser.add_argument("--churn", type=float, default=0.1, help="share of new appids in the last run")
+    parser.add_argument("--latency", type=float, default=0.1, help="stub response delay in seconds")
+    parser.add_argument("--batch", type=int, help="appids per call (default: STEAM_BATCH_SIZE)")
+    parser.add_argument("--workers", type=int, help="calls in flight (default: STEAM_WORKERS)")
+    args = parser.parse_args(argv)
+
+    store_args = {k: v for k, v in (("batch_size", args.batch), ("workers", args.workers)) if v}
+    stub = StubStore(args.latency).start()
+    workdir = tempfile.mkdtemp(prefix="fgn-steam-")
+    try:
+        appids = [str(a) for a in range(args.apps)]
+        run("cold", stub, workdir, appids, **store_args)
+        run("warm", stub, workdir, appids, **store_args)
+        new = int(args.apps * args.churn)
+        run("churn", stub, workdir, appids[new:] + [str(a) for a in range(args.apps, args.apps + new)], **store_args)
+    finally:
+        stub.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Synthetic source payloads shaped like the real pages, scaled to any number
+of cards, plus a writer that turns them into replay fixtures for a whole run.
+"""
+import os
+import sys
+import json
+import math
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import replay  # noqa: E402
+import steam_store  # noqa: E402
+
+EGS_URL = "https://store-site-backend-static.ak.epicgames.com/freeGamesPromotions"
+GOG_URL = "https://catalog.gog.com/v1/catalog"
+STEAMDB_URL = "https://steamdb.info/sales/?min_discount=100"
+HUMBLE_URL = "https://www.humblebundle.com/store/search?sort=discount&filter=onsale&page={page}"
+UBISOFT_URL = "https://news.ubisoft.com/en-us/"
+PRIME_URL = "https://gaming.amazon.com/home"
+STEAM_ITEMS_URL = "https://api.steampowered.com/IStoreBrowseService/GetItems/v1"
+
+
+def _banner(kind, i, banners):
+    return f"https://cdn.example.com/{kind}/{i}.jpg" if banners else ""
+
+
+def egs_json(n, banners=True):
+    elements = []
+    for i in range(n):
+        elements.append({
+            "title": f"Epic Game {i}",
+            "price": {"totalPrice": {"discountPrice": 0}},
+            "keyImages": [{"type": "OfferImageWide", "url": _banner("egs", i, banners)}] if banners else [],
+            "offerMappings": [{"pageSlug": f"epic-game-{i}"}],
+            "promotions": {"promotionalOffers": [{"promotionalOffers": [{
+                "startDate": "2026-01-01T15:00:00.000Z",
+                "endDate": "2031-01-08T15:00:00.000Z",
+                "discountSetting": {"discountPercentage": 0},
+            }]}]},
+        })
+    return {"data": {"Catalog": {"searchStore": {"elements": elements}}}}
+
+
+def gog_json(n, pages=1, banners=True, offset=0):
+    products = [{
+        "title": f"GOG Game {i}",
+        "coverHorizontal": f"https://images.gog-statics.com/{i}" if banners else "",
+        "slug": f"gog_game_{i}",
+    } for i in range(offset, offset + n)]
+    return {"products": products, "pages": pages}
+
+
+def steamdb_html(n):
+    rows = "".join(
+        f'<tr class="app appimg" data-appid="{i}"><td><img src="x"></td><td>{i}</td>'
+        f'<td><a href="https://store.steampowered.com/app/{i}/">Steam Game {i}</a></td>'
+        f"<td>-100%</td><td>0.00</td></tr>"
+        for i in range(n)
+    )
+    return f"<html><head><title>Sales</title></head><body><nav>{'<a>x</a>' * 200}</nav>" \
+           f"<table><tbody>{rows}</tbody></table></body></html>"
+
+
+def humble_html(n, banners=True):
+    cards = "".join(
+        f'<div class="entity-block-container js-entity-block"><a href="/store/humble-game-{i}">'
+        f'<img src="{_banner("humble", i, banners)}"><span class="entity-title">Humble Game {i}</span>'
+        f'<span class="discount-amount">-100%</span><span class="promo-timer">2 days left</span>'
+        f"</a></div>"
+        for i in range(n)
+    )
+    return f"<html><body><header>{'<div>menu</div>' * 200}</header><main>{cards}</main></body></html>"
+
+
+def steam_items_json(appids, banners=True):
+    """GetItems answer for these appids: every one a game on a 100% discount."""
+    items = []
+    for a in appids:
+        item = {
+            "item_type": 0, "id": int(a), "success": 1, "appid": int(a), "name": f"Steam Game {a}", "type": 0,
+            "best_purchase_option": {"active_discounts": [{
+                "discount_amount": "100", "discount_description": "Free to keep", "discount_end_date": 1924992000,
+            }]},
+        }
+        if banners:
+            item["assets"] = {"asset_url_format": f"steam/apps/{a}/${{FILENAME}}?t=1700000000",
+                              "header": "header.jpg"}
+        items.append(item)
+    return {"response": {"store_items": items}}
+
+
+def ubisoft_html(n):
+    articles = "".join(
+        f'<article class="news-list-article grid-item"><a class="news-list-article-link" '
+        f'href="https://news.ubisoft.com/en-us/article/{i}"><div class="news-title">'
+        f"Claim Ubisoft Game {i} free</div><p>Yours to keep.</p></a></article>"
+        for i in range(n)
+    )
+    return f"<html><body>{articles}</body></html>"
+
+
+def prime_html(n, banners=True):
+    cards = "".join(
+        f'<div data-a-target="item-card"><img class="item-card-image__image" src="{_banner("prime", i, banners)}">'
+        f'<h3>Prime Game {i}</h3><div class="item-card-details__footer">Ends in 5 days</div>'
+        f'<a data-a-target="FGWPOffer" href="/prime-game-{i}/dp/{i}"></a></div>'
+        for i in range(n)
+    )
+    return f"<html><body><div id='root'>{cards}</div></body></html>"
+
+
+# Parser input per source: (synthetic payload for n cards, parse function name).
+PAYLOADS = {
+    "egs": (lambda n: egs_json(n), "parse_egs"),
+    "gog": (lambda n: gog_json(n), "parse_gog"),
+    "steamdb": (steamdb_html, "parse_steamdb"),
+    "humble": (lambda n: humble_html(n), "parse_humble"),
+    "ubisoft": (ubisoft_html, "parse_ubisoft"),
+    "prime": (lambda n: prime_html(n), "parse_prime"),
+}
+
+
+def _url(url, params=None):
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+def _save(directory, url, body, content_type):
+    if not isinstance(body, str):
+        body = json.dumps(body)
+    replay.save_fixture(directory, "GET", url, 200, {"Content-Type": content_type}, body.encode("utf-8"))
+
+
+def write_run_fixtures(directory, n, region="IN", gog_page_size=48, max_pages=25, banners=False):
+    """Fixtures for one full run where every source serves about n cards."""
+    _save(directory, _url(EGS_URL, {"locale": "en-US", "country": region, "allowCountries": region}),
+          egs_json(n, banners), "application/json")
+
+    pages = max(1, min(max_pages, math.ceil(n / gog_page_size)))
+    per_page = math.ceil(n / pages)
+    # Pages past the last are still requested while the walk has several in flight.
+    for page in range(1, pages + 8):
+        params = {"limit": gog_page_size, "page": page, "order": "desc:popularity",
+                  "price": "free", "productType": "GAME", "countryCode": region}
+        count = per_page if page <= pages else 0
+        _save(directory, _url(GOG_URL, params),
+              gog_json(count, pages, banners, offset=(page - 1) * per_page), "application/json")
+
+    _save(directory, STEAMDB_URL, steamdb_html(n), "text/html; charset=utf-8")
+    batch = steam_store.STEAM_BATCH_SIZE
+    for i in range(0, n, batch):
+        appids = [str(a) for a in range(i, min(n, i + batch))]
+        _save(directory, _url(STEAM_ITEMS_URL, steam_store.items_params(appids)),
+              steam_items_json(appids, banners), "application/json")
+    _save(directory, HUMBLE_URL.format(page=1), humble_html(n, banners), "text/html; charset=utf-8")
+    for page in range(2, 8):
+        _save(directory, HUMBLE_URL.format(page=page), humble_html(0), "text/html; charset=utf-8")
+    _save(directory, UBISOFT_URL, ubisoft_html(n), "text/html; charset=utf-8")
+    _save(directory, PRIME_URL, prime_html(n, banners), "text/html; charset=utf-8")
@@ -0,0 +1,264 @@
+import os
+import json
+import time
+import signal
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import schedule
+
+import api_server
+from http_client import call_deadline
+from metrics import METRICS
+from source_health import SourceHealth
+
+DAEMON_HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8765"))
+
+# Fields set by the image cache; ignored when deciding whether a poll changed anything.
+_DERIVED_FIELDS = ("thumb", "thumb_srcset")
+
+
+def fingerprint(grouped: dict) -> str:
+    canon = {src: [{k: v for k, v in it.items() if k not in _DERIVED_FIELDS} for it in items]
+             for src, items in grouped.items()}
+    blob = json.dumps(canon, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class Daemon:
+    """
+    Stays resident and polls every source each time its TTL runs out.
+
+    The HTTP pool, the Prime browser and the last grouped snapshot live for
+    the whole process. After each poll the snapshot is rebuilt in memory and
+    only published (files, history, notifications) when it actually changed.
+    Results are served from the same SourceHealth cache as one-shot runs, so
+    a restart picks up where the last run left off.
+    """
+
+    def __init__(self, notifier, sources=None, intervals=None):
+        self.notifier = notifier
+        self.sources = sources or notifier.SOURCES
+        self.intervals = intervals or {name: src.ttl for name, src in self.sources.items()}
+        self.health = SourceHealth()
+        self.lock = threading.Lock()
+        # Held for a whole refresh, so publishes never overlap or run out of order.
+        self.publish_lock = threading.Lock()
+        self.stop = threading.Event()
+        self.running = set()
+        self.results = {}
+        self.stats = {name: {"polls": 0, "failures": 0, "last_poll": None, "last_ok": None,
+                             "duration": 0.0, "items": 0} for name in self.sources}
+        self.publishes = 0
+        self.last_publish = None
+        self.started = time.time()
+
+        for name in self.sources:
+            cached = self.health.cached(name)
+            if cached is not None:
+                self.results[name] = cached
+        # Nothing is published until every source has answered once (or has a
+        # cached result), so a partial first round never reads as removals.
+        self.waiting = {name for name in self.sources if name not in self.results}
+        self.grouped = notifier.load_json(notifier.DATA_FILE, {})
+        # Sources left out of `sources` keep their last result, as with --sources in one-shot runs.
+        self.results.update(notifier.snapshot_results(
+            self.grouped, [n for n in notifier.SOURCES if n not in self.sources], self.health))
+        self.fingerprint = fingerprint(self.grouped)
+        # Read API state, fed from memory after every publish.
+        self.api = api_server.DropsState()
+        self.api.update(self.grouped, notifier.load_json(notifier.CHANGE_LOG_FILE, {}))
+
+    # ------------------ polling ------------------
+
+    def dispatch(self, name):
+        """Runs one poll on its own thread unless the previous one is still going."""
+        with self.lock:
+            if name in self.running:
+                print(f"[DAEMON] {name}: previous poll still running; skipping.")
+                return
+            if not self.health.should_fetch(name):
+                print(f"[DAEMON] {name} breaker is open; not polling.")
+                self.health.record_skipped(name)
+                return
+            self.running.add(name)
+        threading.Thread(target=self.poll, args=(name,), name=f"poll-{name}", daemon=True).start()
+
+    def poll(self, name):
+        t0 = time.monotonic()
+        result, error = None, None
+        try:
+            src = self.sources[name]
+            with METRICS.source(name), METRICS.span("scrape"), call_deadline(time.monotonic() + src.deadline):
+                result = src.fetch()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[DAEMON] {name} failed: {e}")
+        elapsed = time.monotonic() - t0
+
+        with self.lock:
+            st = self.stats[name]
+            st["polls"] += 1
+            st["last_poll"] = time.time()
+            st["duration"] = elapsed
+            if error is None:
+                self.health.record_success(name, result)
+                self.results[name] = result
+                st["last_ok"] = st["last_poll"]
+            else:
+                st["failures"] += 1
+                self.health.record_failure(name, error)
+                cached = self.health.cached(name)
+                if cached is not None:
+                    self.results[name] = cached
+                else:
+                    self.results.pop(name, None)
+            st["items"] = self.notifier.count_items(self.results.get(name))
+            self.waiting.discard(name)
+            self.running.discard(name)
+            print(f"[DAEMON] {name} polled in {elapsed:.1f}s")
+        self.refresh()
+
+    def refresh(self):
+        """
+        Rebuilds the snapshot under the lock and, if it changed, publishes it
+        outside the lock so /health and dispatch are not held up by file
+        writes and notifications. Publishes are serialised by publish_lock.
+        """
+        with self.publish_lock:
+            with self.lock:
+                if self.waiting:
+                    print(f"[DAEMON] Waiting for first results from: {', '.join(sorted(self.waiting))}")
+                    return
+                with METRICS.span("filter"):
+                    grouped = self.notifier.build_grouped(self.results)
+                self.notifier.carry_over_expiry(self.grouped, grouped)
+                fp = fingerprint(grouped)
+                if fp == self.fingerprint:
+                    print("[DAEMON] Snapshot unchanged; nothing written.")
+                    self.health.save()
+                    return
+                previous = self.grouped
+            self.notifier.publish(previous, grouped)
+            self.api.update(grouped, self.notifier.load_json(self.notifier.CHANGE_LOG_FILE, {}))
+            with self.lock:
+                self.grouped = grouped
+                self.fingerprint = fp
+                self.publishes += 1
+                self.last_publish = time.time()
+                self.health.save()
+
+    # ------------------ health / metrics ------------------
+
+    def health_doc(self) -> dict:
+        with self.lock:
+            sources = {}
+            for name, st in self.stats.items():
+                sources[name] = dict(st, state=self.health.state(name),
+                                     interval=self.intervals.get(name), running=name in self.running)
+            return {
+                "status": "ok" if all(s["state"] == "healthy" for s in sources.values()) else "degraded",
+                "uptime": round(time.time() - self.started, 1),
+                "version": self.notifier.load_json(self.notifier.DROPS_VERSION_FILE, {}).get("version", ""),
+                "api_version": self.api.snapshot.version,
+                "drops": sum(len(v) for v in self.grouped.values()),
+                "publishes": self.publishes,
+                "last_publish": self.last_publish,
+                "sources": sources,
+            }
+
+    def metrics_text(self) -> str:
+        doc = self.health_doc()
+        lines = [
+            "# TYPE notifier_up gauge",
+            "notifier_up 1",
+            "# TYPE notifier_uptime_seconds gauge",
+            f"notifier_uptime_seconds {doc['uptime']}",
+            "# TYPE notifier_drops gauge",
+            f"notifier_drops {doc['drops']}",
+            "# TYPE notifier_publishes_total counter",
+            f"notifier_publishes_total {doc['publishes']}",
+        ]
+        series = (
+            ("notifier_source_polls_total", "counter", "polls"),
+            ("notifier_source_failures_total", "counter", "failures"),
+            ("notifier_source_items", "gauge", "items"),
+            ("notifier_source_poll_duration_seconds", "gauge", "duration"),
+            ("notifier_source_last_success_timestamp_seconds", "gauge", "last_ok"),
+        )
+        for metric, kind, field in series:
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, st in doc["sources"].items():
+                lines.append(f'{metric}{{source="{name}"}} {st[field] or 0}')
+        lines.append("# TYPE notifier_source_healthy gauge")
+        for name, st in doc["sources"].items():
+            lines.append(f'notifier_source_healthy{{source="{name}"}} {1 if st["state"] == "healthy" else 0}')
+        # Stage timings and HTTP counters accumulated since the daemon started.
+        return "\n".join(lines) + "\n" + METRICS.prometheus(METRICS.snapshot())
+
+    def serve(self, host=DAEMON_HOST, port=DAEMON_PORT):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/health":
+                    body = json.dumps(daemon.health_doc(), indent=2).encode("utf-8")
+                    ctype = "application/json"
+                elif path == "/metrics":
+                    body = daemon.metrics_text().encode("utf-8")
+                    ctype = "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="daemon-http", daemon=True).start()
+        print(f"[DAEMON] Health on http://{host}:{port}/health, metrics on /metrics")
+        return server
+
+    # ------------------ lifecycle ------------------
+
+    def run(self):
+        server = self.serve()
+        api = api_server.serve(self.api)
+        scheduler = schedule.Scheduler()
+        for name in self.sources:
+            scheduler.every(int(self.intervals[name])).seconds.do(self.dispatch, name)
+            self.dispatch(name)
+        try:
+            while not self.stop.is_set():
+                scheduler.run_pending()
+                self.stop.wait(1)
+        finally:
+            print("[DAEMON] Shutting down.")
+            server.shutdown()
+            api.shutdown()
+            self.notifier.PRIME.close()
+            with self.lock:
+                self.health.save()
+
+
+def run_daemon(notifier, sources=None):
+    """
+    `notifier` is the main module, passed in so it is not imported twice;
+    `sources` limits polling to some of its SOURCES.
+    """
+    d = Daemon(notifier, sources)
+
+    def handle_signal(signum, frame):
+        d.stop.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    d.run()
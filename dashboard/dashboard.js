@@ -2,90 +2,118 @@ document.addEventListener("DOMContentLoaded", () => {
   const contentArea = document.getElementById("content");
   const updatedTimestamp = document.getElementById("updated");
 
-  async function fetchAndRenderGames() {
-    try {
-      const response = await fetch("../drops.json?cachebust=" + new Date().getTime());
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
-      const allGames = await response.json();
-      const groupedByPlatform = allGames.reduce((acc, game) => {
-        const platform = game.platform || "Other";
-        if (!acc[platform]) acc[platform] = [];
-        acc[platform].push(game);
-        return acc;
-      }, {});
-
-      contentArea.innerHTML = '';
-
-      const platformOrder = ["Epic Games Store", "Prime Gaming", "Steam", "GOG", "Humble", "Ubisoft"];
-      const sortedPlatforms = Object.keys(groupedByPlatform).sort((a, b) => {
-        const indexA = platformOrder.indexOf(a);
-        const indexB = platformOrder.indexOf(b);
-        if (indexA === -1) return 1;
-        if (indexB === -1) return -1;
-        return indexA - indexB;
-      });
+  // The page ships pre-rendered with its data inlined; this script only
+  // refreshes it when drops.version.json points at newer data.
+  const inlineData = document.getElementById("drops-data");
+  let currentVersion = inlineData ? inlineData.dataset.version : "";
 
-      if (sortedPlatforms.length === 0) {
-        contentArea.innerHTML = '<p>No free games found at the moment. Check back later!</p>';
-        return;
-      }
+  function renderGames(allGames) {
+    const groupedByPlatform = allGames.reduce((acc, game) => {
+      const platform = game.platform || "Other";
+      if (!acc[platform]) acc[platform] = [];
+      acc[platform].push(game);
+      return acc;
+    }, {});
+
+    contentArea.innerHTML = '';
 
-      for (const platform of sortedPlatforms) {
-        const games = groupedByPlatform[platform];
-        const platformSection = document.createElement("section");
-        platformSection.className = "platform";
-        platformSection.innerHTML = `<h2 class="platform-title">${platform}</h2>`;
+    const platformOrder = ["Epic Games Store", "Prime Gaming", "Steam", "GOG", "Humble", "Ubisoft"];
+    const sortedPlatforms = Object.keys(groupedByPlatform).sort((a, b) => {
+      const indexA = platformOrder.indexOf(a);
+      const indexB = platformOrder.indexOf(b);
+      if (indexA === -1) return 1;
+      if (indexB === -1) return -1;
+      return indexA - indexB;
+    });
+
+    if (sortedPlatforms.length === 0) {
+      contentArea.innerHTML = '<p>No free games found at the moment. Check back later!</p>';
+      return;
+    }
+
+    for (const platform of sortedPlatforms) {
+      const games = groupedByPlatform[platform];
+      const platformSection = document.createElement("section");
+      platformSection.className = "platform";
+      platformSection.innerHTML = `<h2 class="platform-title">${platform}</h2>`;
+      
+      const cardsContainer = document.createElement("div");
+      cardsContainer.className = "cards";
+
+      games.forEach(game => {
+        const claims = game.claim_links || [];
+        const multiClaim = claims.length > 1;
+        const isClickable = !multiClaim && game.link && game.link.startsWith('http');
+        const cardTag = isClickable ? 'a' : 'div';
+        const card = document.createElement(cardTag);
+        card.className = 'card';
+        if(isClickable) {
+          card.href = game.link;
+          card.target = '_blank';
+          card.rel = 'noopener noreferrer';
+        } else if (!multiClaim) {
+          card.classList.add('disabled');
+        }
+
+        // thumb paths are from the site root; this page sits one level down.
+        const banner = game.thumb ? `../${game.thumb}` : game.banner;
+        const srcsetAttr = game.thumb_srcset
+          ? ` srcset="${game.thumb_srcset.split(", ").map(s => `../${s}`).join(", ")}" sizes="220px"`
+          : '';
+        const bannerHtml = banner
+          ? `<img src="${banner}"${srcsetAttr} alt="${game.title}" loading="lazy" onerror="this.style.display='none'">`
+          : '';
         
-        const cardsContainer = document.createElement("div");
-        cardsContainer.className = "cards";
-
-        games.forEach(game => {
-          const isClickable = game.link && game.link.startsWith('http');
-          const cardTag = isClickable ? 'a' : 'div';
-          const card = document.createElement(cardTag);
-          card.className = 'card';
-          if(isClickable) {
-            card.href = game.link;
-            card.target = '_blank';
-            card.rel = 'noopener noreferrer';
-          } else {
-            card.classList.add('disabled');
-          }
-
-          const bannerHtml = game.banner
-            ? `<img src="${game.banner}" alt="${game.title}" onerror="this.style.display='none'">`
-            : '';
-          
-          let ctaHtml = `<span class="badge">Claim Now</span>`;
-          if (!isClickable) {
-            ctaHtml = `
-              <span class="badge">🔒</span>
-              <span class="cta-text">${game.cta || 'See official site for details'}</span>
-            `;
-          }
-
-          card.innerHTML = `
-            ${bannerHtml}
-            <div class="card-content">
-              <h4>${game.title}</h4>
-              <p>${game.status || 'Free Now'}</p>
-              <div class="cta">
-                ${ctaHtml}
-              </div>
-            </div>
+        let ctaHtml = `<span class="badge">Claim Now</span>`;
+        if (multiClaim) {
+          ctaHtml = claims.map(c =>
+            `<a class="badge" href="${c.link}" target="_blank" rel="noopener noreferrer">Claim on ${c.platform}</a>`
+          ).join('');
+        } else if (!isClickable) {
+          ctaHtml = `
+            <span class="badge">🔒</span>
+            <span class="cta-text">${game.cta || 'See official site for details'}</span>
           `;
-          cardsContainer.appendChild(card);
-        });
+        }
 
-        platformSection.appendChild(cardsContainer);
-        contentArea.appendChild(platformSection);
+        card.innerHTML = `
+          ${bannerHtml}
+          <div class="card-content">
+            <h4>${game.title}</h4>
+            <p>${game.status || 'Free Now'}</p>
+            <div class="cta">
+              ${ctaHtml}
+            </div>
+          </div>
+        `;
+        cardsContainer.appendChild(card);
+      });
+
+      platformSection.appendChild(cardsContainer);
+      contentArea.appendChild(platformSection);
+    }
+  }
+
+  async function refreshIfStale() {
+    try {
+      const versionResponse = await fetch("../drops.version.json", { cache: "no-cache" });
+      if (!versionResponse.ok) {
+        throw new Error(`HTTP error! status: ${versionResponse.status}`);
       }
+      const { version } = await versionResponse.json();
+      if (version && version === currentVersion) return;
 
+      const response = await fetch("../drops.json?v=" + encodeURIComponent(version || ""));
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      renderGames(await response.json());
+      currentVersion = version;
     } catch (error) {
       console.error("Failed to fetch or render games:", error);
-      contentArea.innerHTML = `<p style="color: #ff5555;">Could not load game data. Please try refreshing the page.</p>`;
+      if (!contentArea.querySelector(".platform")) {
+        contentArea.innerHTML = `<p style="color: #ff5555;">Could not load game data. Please try refreshing the page.</p>`;
+      }
     }
   }
 
@@ -121,5 +149,11 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   });
 
-  fetchAndRenderGames();
+  if (!currentVersion) {
+    refreshIfStale();
+  }
+  document.addEventListener("visibilitychange", () => {
+    if (document.visibilityState === "visible") refreshIfStale();
+  });
+  setInterval(refreshIfStale, 10 * 60 * 1000);
 });
\ No newline at end of file
@@ -0,0 +1,177 @@
+import math
+import re
+from collections import Counter
+from urllib.parse import urlsplit
+
+from identity import base_title
+
+# Trigram Jaccard similarity at which two titles on different stores are one game.
+THRESHOLD = 0.85
+# Lower bar when one listing names the store the other is on (Prime's -epic/-gog claims).
+HINTED_THRESHOLD = 0.6
+# Prime Gaming claim slugs end in the store the game redeems on.
+SLUG_HINTS = {"epic": "Epic Games Store", "gog": "GOG"}
+# Platforms whose titles are headlines that mention a game ("Claim X for free").
+MENTION_PLATFORMS = ("Ubisoft",)
+# Shortest title a headline may be matched on by containment.
+MIN_MENTION_LEN = 6
+
+_NUMBER = re.compile(r"^(?:\d+|[ivx]+)$")
+
+
+def trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def slug_hint(link: str):
+    """The store a Prime Gaming claim redeems on, from its slug (/claims/<game>-epic/...)."""
+    parts = urlsplit(link or "")
+    if "amazon." not in parts.netloc:
+        return None
+    for segment in parts.path.split("/"):
+        head, _, tail = segment.rpartition("-")
+        if head and tail in SLUG_HINTS:
+            return SLUG_HINTS[tail]
+    return None
+
+
+class _Title:
+    __slots__ = ("platform", "base", "grams", "numbers", "hint")
+
+    def __init__(self, item):
+        self.platform = item.get("platform") or ""
+        self.base = base_title(item.get("title"))
+        self.grams = trigrams(self.base) if self.base else set()
+        self.numbers = frozenset(w for w in self.base.split() if _NUMBER.match(w))
+        self.hint = slug_hint(item.get("link"))
+
+
+def _jaccard(a: _Title, b: _Title) -> float:
+    shared = len(a.grams & b.grams)
+    return shared / (len(a.grams) + len(b.grams) - shared)
+
+
+def _mentioned(headline: _Title, by_base: dict):
+    """Items whose whole title appears in the headline, not followed by a sequel number."""
+    words = headline.base.split()
+    found = []
+    for i in range(len(words)):
+        for j in range(i + 1, len(words) + 1):
+            if j < len(words) and _NUMBER.match(words[j]):
+                continue
+            span = " ".join(words[i:j])
+            if len(span) >= MIN_MENTION_LEN:
+                found.extend(by_base.get(span, ()))
+    return found
+
+
+def link_duplicates(items, stats: dict = None, platform_order=(), threshold=THRESHOLD):
+    """
+    Folds listings of the same game on different platforms into one drop.
+
+    Titles are compared on base_title() through a trigram index with prefix
+    filtering: each title is indexed under its rarest trigrams only, few
+    enough that any pair at or above the similarity bar still shares one,
+    so a lookup touches a handful of candidates instead of every item.
+    Titles must agree on sequel numbers and a cluster holds one listing
+    per platform. Headlines (MENTION_PLATFORMS) also match a game whose
+    title is one of their word spans.
+
+    The kept drop of each cluster is the store a Prime claim points at,
+    else the first in platform_order; it gets `claim_links`, one
+    {"platform", "link"} per listing. Returns the kept items in order.
+    """
+    items = list(items)
+    titles = [_Title(it) for it in items]
+    rank = {p: i for i, p in enumerate(platform_order)}
+    hinted = {t.hint for t in titles if t.hint}
+    df = Counter(g for t in titles for g in t.grams)
+
+    def bar(a, b=None):
+        if b is None:
+            return HINTED_THRESHOLD if a.hint or a.platform in hinted else threshold
+        return HINTED_THRESHOLD if b.platform == a.hint or a.platform == b.hint else threshold
+
+    def prefix(t):
+        # Keyed on the sequel numbers too: titles that differ there never match.
+        ordered = sorted(t.grams, key=lambda g: (df[g], g))
+        return [(t.numbers, g) for g in ordered[:len(ordered) - math.ceil(bar(t) * len(ordered)) + 1]]
+
+    index = {}
+    by_base = {}
+    cluster_of = {}
+    clusters = []
+
+    def join(i, candidates, score):
+        best, best_score = None, 0.0
+        for j in candidates:
+            s = score(j)
+            if not s or s < best_score:
+                continue
+            c = cluster_of[j]
+            if s == best_score and c > best:
+                continue
+            if any(titles[m].platform == titles[i].platform for m in clusters[c]):
+                continue
+            best, best_score = c, s
+        if best is None:
+            cluster_of[i] = len(clusters)
+            clusters.append([i])
+        else:
+            cluster_of[i] = best
+            clusters[best].append(i)
+
+    def similar(t):
+        def score(j):
+            other = titles[j]
+            s = _jaccard(t, other)
+            return s if s >= bar(t, other) else 0.0
+        return score
+
+    mentions = []
+    for i, t in enumerate(titles):
+        if not t.grams:
+            continue
+        if t.platform in MENTION_PLATFORMS:
+            mentions.append(i)
+            continue
+        keys = prefix(t)
+        join(i, {j for k in keys for j in index.get(k, ())}, similar(t))
+        for k in keys:
+            index.setdefault(k, []).append(i)
+        by_base.setdefault(t.base, []).append(i)
+
+    for i in mentions:
+        t = titles[i]
+        contained = set(_mentioned(t, by_base))
+        by_title = similar(t)
+
+        def score(j, t=t, contained=contained, by_title=by_title):
+            s = by_title(j)
+            if j in contained:
+                s = max(s, len(titles[j].grams) / len(t.grams))
+            return s
+        join(i, contained | {j for k in prefix(t) for j in index.get(k, ())}, score)
+
+    dropped = set()
+    for members in clusters:
+        if len(members) < 2:
+            continue
+        hinted_here = {titles[m].hint for m in members}
+        members.sort(key=lambda m: (titles[m].platform not in hinted_here,
+                                    rank.get(titles[m].platform, len(rank)), m))
+        keep = items[members[0]]
+        keep["claim_links"] = [
+            {"platform": items[m].get("platform"), "link": items[m].get("link")}
+            for m in members if (items[m].get("link") or "").startswith("http")
+        ]
+        if not keep.get("banner"):
+            keep["banner"] = next((items[m].get("banner") for m in members if items[m].get("banner")), "")
+        dropped.update(members[1:])
+        print(f"[DUPES] {keep.get('title')!r} on {keep.get('platform')} also on "
+              + ", ".join(items[m].get("platform") for m in members[1:]))
+
+    if stats is not None:
+        stats["cross_platform"] = stats.get("cross_platform", 0) + len(dropped)
+    return [it for i, it in enumerate(items) if i not in dropped]
@@ -0,0 +1,183 @@
+import os
+import json
+import hashlib
+import mimetypes
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+# Change feeds, next to the full snapshots, for pollers that only want deltas.
+FEED_DIR = "feeds"
+FEED_FILES = {"json": "feed.json", "rss": "rss.xml", "atom": "atom.xml"}
+FEED_TYPES = {"json": "application/feed+json", "rss": "application/rss+xml", "atom": "application/atom+xml"}
+MANIFEST_FILE = "manifest.json"
+# Bounded window: at most this many entries, none older than this many days.
+FEED_WINDOW = int(os.getenv("FEED_WINDOW", "100"))
+FEED_MAX_AGE_DAYS = int(os.getenv("FEED_MAX_AGE_DAYS", "30"))
+FEED_TITLE = "Free Game Notifier"
+# Atom requires an author on the feed (or on every entry).
+FEED_AUTHOR = os.getenv("FEED_AUTHOR", FEED_TITLE)
+# JSON Feed extension object carrying the machine-readable delta.
+EXTENSION = "_free_game_notifier"
+
+_KIND_LABEL = {"new": "New", "expired": "Expired"}
+
+
+def iso(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse(ts: str) -> datetime:
+    return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+
+
+def image_type(url: str):
+    """MIME type of an image from its URL's extension, None when it has none we know."""
+    kind = mimetypes.guess_type(urlsplit(url).path)[0]
+    return kind if kind and kind.startswith("image/") else None
+
+
+def feed_url(base_url: str, kind: str) -> str:
+    return f"{base_url.rstrip('/')}/{FEED_DIR}/{FEED_FILES[kind]}"
+
+
+def entry_id(event: dict, when: datetime, base_url: str) -> str:
+    """
+    tag: URI from the event kind, the item's identity key and the day, so
+    the same change re-emitted on the same day (a flapping listing) keeps
+    its id and replaces its old entry instead of adding another.
+    """
+    host = urlsplit(base_url).netloc or "free-game-notifier"
+    digest = hashlib.sha1(event["key"].encode("utf-8")).hexdigest()[:16]
+    return f"tag:{host},{when.astimezone(timezone.utc):%Y-%m-%d}:{event['event']}/{digest}"
+
+
+def make_entry(event: dict, when: datetime, base_url: str) -> dict:
+    kind = event["event"]
+    platforms = event.get("platforms") or [event["platform"]]
+    entry = {
+        "id": entry_id(event, when, base_url),
+        "title": f"{_KIND_LABEL.get(kind, kind.title())}: {event['title']} ({event['platform']})",
+        "content_html": event["line"],
+        "date_published": iso(when),
+        "tags": platforms,
+        EXTENSION: {"event": kind, "key": event["key"], "platform": event["platform"], "platforms": platforms},
+    }
+    if event.get("link"):
+        entry["url"] = event["link"]
+    if event.get("image"):
+        entry["image"] = event["image"]
+    if event.get("ends_at"):
+        entry[EXTENSION]["ends_at"] = event["ends_at"]
+    return entry
+
+
+def merge_entries(previous: list, events: list, now: datetime, base_url: str,
+                  window: int = FEED_WINDOW, max_age_days: int = FEED_MAX_AGE_DAYS) -> list:
+    """
+    The new window: this run's events first, then the previous entries
+    they do not replace, minus anything past the age limit or the window.
+    """
+    fresh = [make_entry(ev, now, base_url) for ev in events]
+    ids = {e["id"] for e in fresh}
+    cutoff = now - timedelta(days=max_age_days)
+    kept = [e for e in previous if e.get("id") not in ids and _parse(e["date_published"]) >= cutoff]
+    return (fresh + kept)[:window]
+
+
+def render_json(entries: list, base_url: str) -> bytes:
+    doc = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": FEED_TITLE,
+        "home_page_url": base_url,
+        "feed_url": feed_url(base_url, "json"),
+        "items": entries,
+    }
+    return json.dumps(doc, ensure_ascii=False, indent=1).encode("utf-8")
+
+
+def render_rss(entries: list, base_url: str) -> bytes:
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>\n',
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>',
+        f"<title>{escape(FEED_TITLE)}</title><link>{escape(base_url)}</link>",
+        f"<description>{escape(FEED_TITLE)} changes</description>",
+        f'<atom:link href={quoteattr(feed_url(base_url, "rss"))} rel="self" type="{FEED_TYPES["rss"]}"/>',
+    ]
+    if entries:
+        parts.append(f"<lastBuildDate>{format_datetime(_parse(entries[0]['date_published']), usegmt=True)}</lastBuildDate>")
+    for e in entries:
+        parts.append("<item>")
+        parts.append(f"<title>{escape(e['title'])}</title>")
+        if e.get("url"):
+            parts.append(f"<link>{escape(e['url'])}</link>")
+        parts.append(f'<guid isPermaLink="false">{escape(e["id"])}</guid>')
+        parts.append(f"<pubDate>{format_datetime(_parse(e['date_published']), usegmt=True)}</pubDate>")
+        parts.extend(f"<category>{escape(t)}</category>" for t in e.get("tags", ()))
+        parts.append(f"<description>{escape(e['content_html'])}</description>")
+        kind = image_type(e["image"]) if e.get("image") else None
+        if kind:
+            parts.append(f'<enclosure url={quoteattr(e["image"])} length="0" type="{kind}"/>')
+        parts.append("</item>")
+    parts.append("</channel></rss>\n")
+    return "".join(parts).encode("utf-8")
+
+
+def render_atom(entries: list, base_url: str) -> bytes:
+    updated = entries[0]["date_published"] if entries else "1970-01-01T00:00:00Z"
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>\n',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"<id>{escape(feed_url(base_url, 'atom'))}</id><title>{escape(FEED_TITLE)}</title>",
+        f"<updated>{updated}</updated>",
+        f"<author><name>{escape(FEED_AUTHOR)}</name></author>",
+        f'<link rel="self" href={quoteattr(feed_url(base_url, "atom"))}/>',
+        f"<link href={quoteattr(base_url)}/>",
+    ]
+    for e in entries:
+        parts.append("<entry>")
+        parts.append(f"<id>{escape(e['id'])}</id><title>{escape(e['title'])}</title>")
+        parts.append(f"<updated>{e['date_published']}</updated><published>{e['date_published']}</published>")
+        if e.get("url"):
+            parts.append(f"<link href={quoteattr(e['url'])}/>")
+        if e.get("image"):
+            parts.append(f'<link rel="enclosure" href={quoteattr(e["image"])}/>')
+        parts.extend(f"<category term={quoteattr(t)}/>" for t in e.get("tags", ()))
+        parts.append(f'<content type="html">{escape(e["content_html"])}</content>')
+        parts.append("</entry>")
+    parts.append("</feed>\n")
+    return "".join(parts).encode("utf-8")
+
+
+RENDERERS = {"json": render_json, "rss": render_rss, "atom": render_atom}
+
+
+def build_manifest(docs: dict, previous: dict, entries: list, now: datetime, snapshot: dict = None) -> dict:
+    """
+    ETag and Last-Modified per feed document. Last-Modified only moves when
+    the document's bytes do, so an unchanged run leaves the manifest as is
+    and a poller can compare it (or send the values as If-None-Match /
+    If-Modified-Since) before downloading anything.
+    """
+    old = previous.get("feeds", {}) if isinstance(previous, dict) else {}
+    feeds = {}
+    for kind, data in docs.items():
+        etag = '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+        prev = old.get(kind) or {}
+        feeds[kind] = {
+            "path": f"{FEED_DIR}/{FEED_FILES[kind]}",
+            "type": FEED_TYPES[kind],
+            "etag": etag,
+            "last_modified": prev["last_modified"] if prev.get("etag") == etag and prev.get("last_modified")
+            else format_datetime(now.astimezone(timezone.utc), usegmt=True),
+            "bytes": len(data),
+        }
+    manifest = {
+        "latest_id": entries[0]["id"] if entries else None,
+        "entries": len(entries),
+        "feeds": feeds,
+    }
+    if snapshot:
+        manifest["snapshot"] = snapshot
+    return manifest
@@ -0,0 +1,41 @@
+import os
+import hashlib
+import tempfile
+
+
+def write_atomic(path: str, data) -> None:
+    """
+    Writes `data` (bytes, or str as UTF-8) through a uniquely named temp
+    file in the same directory and a rename, so readers never see a
+    partial file and concurrent writers never share a temp file.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def write_if_changed(path: str, data) -> bool:
+    """
+    write_atomic(), skipped entirely when the file already holds exactly
+    these bytes. Returns True when the file was (re)written.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest():
+                return False
+    except OSError:
+        pass
+    write_atomic(path, data)
+    return True
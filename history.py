@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+
+from identity import normalize_title
+
+HISTORY_DB = os.getenv("HISTORY_DB", "history.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drops (
+    id          INTEGER PRIMARY KEY,
+    item_key    TEXT NOT NULL,
+    platform    TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    norm_title  TEXT NOT NULL,
+    link        TEXT NOT NULL DEFAULT '',
+    banner      TEXT NOT NULL DEFAULT '',
+    month       TEXT NOT NULL,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT,
+    active      INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_drops_month ON drops (month, platform);
+CREATE INDEX IF NOT EXISTS idx_drops_platform ON drops (platform, month);
+CREATE INDEX IF NOT EXISTS idx_drops_norm_title ON drops (norm_title);
+CREATE INDEX IF NOT EXISTS idx_drops_active_key ON drops (item_key) WHERE active = 1;
+"""
+
+
+class HistoryStore:
+    """
+    Every drop ever seen, one row per appearance.
+
+    A row is inserted when an item shows up (first_seen) and closed when it
+    disappears (last_seen, active=0); a game that comes back later gets a
+    new row. Rows are only written for changes, so a run with no changes
+    leaves the database untouched.
+    """
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ---------- writes ----------
+
+    def record_added(self, entries, when):
+        """entries: iterable of (item_key, platform, item) that just appeared."""
+        ts = when.isoformat(timespec="seconds")
+        month = when.strftime("%Y-%m")
+        rows = [
+            (key, src, it.get("title") or "", normalize_title(it.get("title")),
+             it.get("link") or "", it.get("banner") or "", month, ts)
+            for key, src, it in entries
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO drops (item_key, platform, title, norm_title, link, banner, month, first_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def active_keys(self) -> set:
+        return {r[0] for r in self.conn.execute("SELECT item_key FROM drops WHERE active = 1")}
+
+    def record_removed(self, keys, when):
+        """Closes the open row of every item_key that disappeared."""
+        ts = when.isoformat(timespec="seconds")
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE drops SET last_seen = ?, active = 0 WHERE item_key = ? AND active = 1",
+                [(ts, k) for k in keys],
+            )
+
+    # ---------- queries ----------
+
+    def was_ever_free(self, title, platform=None):
+        """Every appearance of `title` (matched on its normalized form), oldest first."""
+        sql = "SELECT * FROM drops WHERE norm_title = ?"
+        args = [normalize_title(title)]
+        if platform:
+            sql += " AND platform = ?"
+            args.append(platform)
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY first_seen", args)]
+
+    def drops_per_platform_per_month(self, month=None):
+        """{month: {platform: count}}, optionally for a single month."""
+        sql = "SELECT month, platform, COUNT(*) AS n FROM drops"
+        args = []
+        if month:
+            sql += " WHERE month = ?"
+            args.append(month)
+        out = {}
+        for r in self.conn.execute(sql + " GROUP BY month, platform ORDER BY month, platform", args):
+            out.setdefault(r["month"], {})[r["platform"]] = r["n"]
+        return out
+
+    def titles_in_month(self, month, platform=None):
+        sql = "SELECT title FROM drops WHERE month = ?"
+        args = [month]
+        if platform:
+            sql += " AND platform = ?"
+            args.append(platform)
+        return [r["title"] for r in self.conn.execute(sql + " ORDER BY first_seen", args)]
+
+    def active(self):
+        return [dict(r) for r in self.conn.execute("SELECT * FROM drops WHERE active = 1")]
+
+    # ---------- migration ----------
+
+    def migrate_monthly_archive(self, archive_path) -> int:
+        """
+        Imports the legacy {month: [title, ...]} archive. Those entries have
+        no platform, link or dates, so they are stored under platform
+        "Unknown" as closed rows dated to the first of their month.
+        """
+        if not os.path.exists(archive_path):
+            return 0
+        with open(archive_path, "r", encoding="utf-8") as f:
+            monthly = json.load(f)
+        rows = []
+        for month, titles in monthly.items():
+            ts = f"{month}-01T00:00:00"
+            for title in titles:
+                norm = normalize_title(title)
+                rows.append((f"archive|title:{norm}", "Unknown", title, norm, month, ts, ts))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO drops (item_key, platform, title, norm_title, month, first_seen, last_seen, active) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                rows,
+            )
+        return len(rows)
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM drops LIMIT 1").fetchone() is None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the free game history store.")
+    parser.add_argument("--db", default=HISTORY_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    mig = sub.add_parser("migrate", help="import monthly_archive.json")
+    mig.add_argument("archive", nargs="?", default="monthly_archive.json")
+    ever = sub.add_parser("ever", help="was a title ever free?")
+    ever.add_argument("title")
+    ever.add_argument("--platform")
+    stats = sub.add_parser("stats", help="drops per platform per month")
+    stats.add_argument("--month")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.db)
+    try:
+        if args.cmd == "migrate":
+            print(f"Imported {store.migrate_monthly_archive(args.archive)} archive entries.")
+        elif args.cmd == "ever":
+            rows = store.was_ever_free(args.title, args.platform)
+            if not rows:
+                print("Never seen.")
+            for r in rows:
+                print(f"{r['first_seen']}  {r['platform']:<18} {r['title']}  (until {r['last_seen'] or 'now'})")
+        elif args.cmd == "stats":
+            for month, per_platform in store.drops_per_platform_per_month(args.month).items():
+                print(month, ", ".join(f"{p}: {n}" for p, n in per_platform.items()))
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import replay
+from fileio import write_atomic
+from metrics import METRICS
+
+CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".http_cache")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Deadline applied to every get() made under call_deadline(), e.g. by a source's scraper.
+_call_deadline = ContextVar("http_call_deadline", default=None)
+
+
+@contextmanager
+def call_deadline(at):
+    """Caps every HttpClient.get() in this context (and pools started with METRICS.carry_source) at `at`."""
+    token = _call_deadline.set(at)
+    try:
+        yield
+    finally:
+        _call_deadline.reset(token)
+
+
+class HttpClient:
+    """
+    One pooled requests.Session shared by every scraper.
+
+    - keep-alive connections are pooled per host by the mounted adapters
+    - at most `max_per_host` requests run against one host at a time
+    - connection errors, timeouts and 429/5xx answers are retried with
+      full-jitter exponential backoff (Retry-After is honoured when sent),
+      but never past the call's deadline: attempts are cut to the time
+      left and no attempt or backoff starts once it has passed
+    - 200 answers carrying an ETag or Last-Modified are kept on disk, and the
+      next request for the same URL is made conditional; a 304 is served
+      from the cached body as if it were a normal 200
+    - with HTTP_RECORD / HTTP_REPLAY set (see replay.py) responses are
+      recorded as fixtures or served from them, and the cache is bypassed
+    - requests, retries, bytes received and cache hits are counted in
+      METRICS against the source making the call
+    """
+
+    def __init__(self, headers=None, cache_dir=CACHE_DIR, retries=3,
+                 backoff=0.5, max_backoff=8.0, pool_size=16, max_per_host=4):
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.transport = replay.install(self.session, pool_size=pool_size)
+        self.cache_dir = None if self.transport else cache_dir
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_per_host = max_per_host
+        self._lock = threading.Lock()
+        self._host_slots = {}
+
+    # ---------- cache ----------
+
+    def _cache_key(self, url, params):
+        full = url + ("?" + urlencode(sorted(params.items())) if params else "")
+        return hashlib.sha1(full.encode("utf-8")).hexdigest()
+
+    def _cache_paths(self, key):
+        return (os.path.join(self.cache_dir, key + ".json"),
+                os.path.join(self.cache_dir, key + ".body"))
+
+    def _load_cached(self, key):
+        if not self.cache_dir:
+            return None
+        meta_path, body_path = self._cache_paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def _store_cached(self, key, resp):
+        if not self.cache_dir:
+            return
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        meta = {
+            "url": resp.url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": resp.headers.get("Content-Type", ""),
+            "encoding": resp.encoding,
+        }
+        meta_path, body_path = self._cache_paths(key)
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_atomic(body_path, resp.content)
+            write_atomic(meta_path, json.dumps(meta))
+
+    @staticmethod
+    def _from_cache(meta, body, resp):
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = body
+        cached.url = meta.get("url") or resp.url
+        cached.encoding = meta.get("encoding")
+        cached.headers.update(resp.headers)
+        if meta.get("content_type"):
+            cached.headers["Content-Type"] = meta["content_type"]
+        cached.request = resp.request
+        cached.from_cache = True
+        return cached
+
+    # ---------- retries ----------
+
+    def _sleep_before_retry(self, attempt, resp=None, deadline=None):
+        """Waits out the backoff; returns False instead when that would run past `deadline`."""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    pass
+            delay = max(0.0, min(delay, self.max_backoff))
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        return slot
+
+    # ---------- public ----------
+
+    def get(self, url, params=None, headers=None, timeout=20, use_cache=True, deadline=None):
+        """
+        GET with retries. `timeout` bounds each attempt; `deadline` (a
+        time.monotonic() value) bounds the whole call, retries included,
+        and raises requests.Timeout once it has passed. A call_deadline()
+        around the call caps it too.
+        """
+        scoped = _call_deadline.get()
+        if scoped is not None:
+            deadline = scoped if deadline is None else min(deadline, scoped)
+        key = self._cache_key(url, params)
+        cached = self._load_cached(key) if use_cache else None
+
+        req_headers = dict(headers or {})
+        if cached:
+            meta = cached[0]
+            if meta.get("etag"):
+                req_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                req_headers["If-Modified-Since"] = meta["last_modified"]
+
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            attempt_timeout = timeout
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise requests.Timeout(f"deadline passed before attempt {attempt + 1} for {url}")
+                attempt_timeout = min(timeout, left)
+            METRICS.count("http_requests")
+            try:
+                with self._host_slot(url):
+                    resp = self.session.get(url, params=params, headers=req_headers, timeout=attempt_timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if last or not self._sleep_before_retry(attempt, deadline=deadline):
+                    raise
+                METRICS.count("http_retries")
+                continue
+            METRICS.count("http_bytes", len(resp.content))
+
+            if resp.status_code in RETRY_STATUSES and not last:
+                if self._sleep_before_retry(attempt, resp, deadline):
+                    METRICS.count("http_retries")
+                    continue
+
+            if resp.status_code == 304 and cached:
+                METRICS.count("http_cache_hits")
+                return self._from_cache(cached[0], cached[1], resp)
+
+            resp.from_cache = False
+            if resp.status_code == 200 and use_cache:
+                self._store_cached(key, resp)
+            return resp
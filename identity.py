@@ -0,0 +1,39 @@
+import re
+import unicodedata
+from urllib.parse import urlsplit
+
+_TITLE_JUNK = re.compile(r"[™®©]")
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+def normalize_title(title: str) -> str:
+    """Case/width/punctuation-insensitive form of a title, used for identity."""
+    t = unicodedata.normalize("NFKC", title or "")
+    t = _TITLE_JUNK.sub("", t).casefold()
+    return _NON_WORD.sub(" ", t).strip()
+
+def canonical_link(link: str) -> str:
+    """Scheme/host-normalized link without query, fragment or trailing slash."""
+    link = (link or "").strip()
+    if not link:
+        return ""
+    parts = urlsplit(link)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"https://{host}{parts.path.rstrip('/')}"
+
+# Edition and packaging suffixes that do not make a different game.
+_EDITION_SUFFIX = re.compile(
+    r"(?:\s+(?:(?:digital\s+)?(?:standard|deluxe|gold|ultimate|complete|definitive|enhanced|"
+    r"special|premium|anniversary|collector s|game of the year|goty)\s+)?edition"
+    r"|\s+goty|\s+director s cut)$"
+)
+
+def base_title(title: str) -> str:
+    """normalize_title() without edition suffixes, for matching one game across stores."""
+    t = normalize_title(title)
+    while True:
+        stripped = _EDITION_SUFFIX.sub("", t)
+        if stripped == t or not stripped:
+            return t
+        t = stripped
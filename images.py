@@ -0,0 +1,146 @@
+import os
+import io
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from fileio import write_atomic
+
+# Published thumbnails (next to dashboard.html) and the URL -> content index.
+IMAGE_DIR = "dashboard/img"
+IMAGE_INDEX = os.path.join(IMAGE_DIR, "index.json")
+# Full-size originals, content-addressed; kept out of the repo.
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", ".image_cache")
+THUMB_WIDTHS = (220, 440)
+THUMB_QUALITY = 80
+DOWNLOAD_WORKERS = 8
+
+
+class ImageCache:
+    """
+    Turns remote banner URLs into small local WebP thumbnails.
+
+    The banner field keeps the original URL, since drops.json and the API
+    publish it as is; the thumbnail goes in `thumb` and `thumb_srcset`,
+    paths from the site root (next to drops.json), under `url_prefix`.
+
+    Each unique URL is downloaded once; the original is stored under the
+    sha256 of its bytes and every configured width is rendered from it.
+    dashboard/img/index.json remembers which URL produced which hash, so
+    later runs do no network work for banners they already have.
+    Thumbnails no longer referenced by any drop are evicted.
+    """
+
+    def __init__(self, http, out_dir=IMAGE_DIR, index_path=IMAGE_INDEX,
+                 cache_dir=IMAGE_CACHE_DIR, widths=THUMB_WIDTHS, url_prefix=IMAGE_DIR):
+        self.http = http
+        self.out_dir = out_dir
+        self.url_prefix = url_prefix.rstrip("/")
+        self.index_path = index_path
+        self.cache_dir = cache_dir
+        self.widths = widths
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def thumb_name(self, digest, width):
+        return f"{digest}-{width}.webp"
+
+    def _thumbs_exist(self, digest):
+        return all(os.path.exists(os.path.join(self.out_dir, self.thumb_name(digest, w)))
+                   for w in self.widths)
+
+    def _render_thumbs(self, digest, original: bytes):
+        from PIL import Image
+
+        with Image.open(io.BytesIO(original)) as img:
+            img.load()
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+            for w in self.widths:
+                thumb = img
+                if img.width > w:
+                    thumb = img.resize((w, max(1, round(img.height * w / img.width))), Image.LANCZOS)
+                thumb.save(os.path.join(self.out_dir, self.thumb_name(digest, w)),
+                           "WEBP", quality=THUMB_QUALITY, method=6)
+
+    def _fetch(self, url):
+        """Makes sure thumbnails exist for url; returns its content hash or None."""
+        digest = self.index.get(url)
+        if digest and self._thumbs_exist(digest):
+            return digest
+        original = None
+        if digest:
+            try:
+                with open(os.path.join(self.cache_dir, digest), "rb") as f:
+                    original = f.read()
+            except OSError:
+                pass
+        try:
+            if original is None:
+                resp = self.http.get(url, timeout=20, use_cache=False)
+                resp.raise_for_status()
+                original = resp.content
+                digest = hashlib.sha256(original).hexdigest()[:20]
+                with open(os.path.join(self.cache_dir, digest), "wb") as f:
+                    f.write(original)
+            if not self._thumbs_exist(digest):
+                self._render_thumbs(digest, original)
+        except Exception as e:
+            print(f"[IMAGES] Could not process {url}: {e}")
+            return None
+        return digest
+
+    def process(self, grouped: dict):
+        """
+        Points every item's thumb/thumb_srcset at its local thumbnails and
+        evicts unreferenced images.
+        """
+        # Pillow is only loaded here, so importing this module stays cheap.
+        try:
+            import PIL.Image  # noqa: F401
+        except ImportError:
+            print("[IMAGES] Pillow not installed; keeping remote banners.")
+            return
+        os.makedirs(self.out_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        items = [it for its in grouped.values() for it in its]
+        urls = {}
+        for it in items:
+            src = it.get("banner") or ""
+            if src.startswith("http"):
+                urls[src] = None
+
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="image") as pool:
+            for url, digest in zip(urls, pool.map(self._fetch, urls)):
+                urls[url] = digest
+
+        for it in items:
+            digest = urls.get(it.get("banner") or "")
+            if not digest:
+                continue
+            it["thumb"] = f"{self.url_prefix}/{self.thumb_name(digest, self.widths[0])}"
+            it["thumb_srcset"] = ", ".join(
+                f"{self.url_prefix}/{self.thumb_name(digest, w)} {w}w" for w in self.widths
+            )
+
+        new_index = {u: d for u, d in urls.items() if d}
+        self._evict(set(new_index.values()))
+        if new_index != self.index:
+            self.index = new_index
+            write_atomic(self.index_path, json.dumps(new_index, indent=2, sort_keys=True))
+        print(f"[IMAGES] {len(new_index)}/{len(urls)} banners served from local thumbnails.")
+
+    def _evict(self, keep: set):
+        index_name = os.path.basename(self.index_path)
+        for name in os.listdir(self.out_dir):
+            if name == index_name:
+                continue
+            if name.rsplit("-", 1)[0] not in keep:
+                os.remove(os.path.join(self.out_dir, name))
+        for name in os.listdir(self.cache_dir):
+            if name not in keep:
+                os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,140 @@
+import sys
+
+# Fields every scraper fills, in the order they are written out.
+FIELDS = ("platform", "title", "status", "banner", "link")
+# Fields many items carry; slotted too, but written out only when set.
+OPTIONAL = ("cta", "starts_at", "ends_at")
+# Values repeated across many items; interned so they are stored once.
+_INTERNED = ("platform", "status", "cta")
+
+
+class Item:
+    """
+    One drop, as a compact record.
+
+    The five common fields and the usual optional ones (cta, starts_at,
+    ends_at) live in slots; anything else a source adds (regions,
+    thumb_srcset, ...) goes into a small `extra` dict that only exists
+    when needed. Platform, status and CTA strings are interned, so
+    thousands of items share one copy.
+
+    Items behave like the dicts they replace: get(), [], `in`, keys(),
+    items() and dict(item) all work, and to_dict() gives the JSON form
+    (common fields first, then the optional ones that are set, then
+    extras in the order they were set).
+    """
+
+    __slots__ = FIELDS + OPTIONAL + ("extra",)
+
+    def __init__(self, platform="", title="", status="", banner="", link="", **extra):
+        self.platform = sys.intern(platform or "")
+        self.title = title or ""
+        self.status = sys.intern(status or "")
+        self.banner = banner or ""
+        self.link = link or ""
+        self.cta = self.starts_at = self.ends_at = None
+        self.extra = None
+        for k, v in extra.items():
+            self[k] = v
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, Item):
+            return data
+        it = cls.__new__(cls)
+        it.platform = sys.intern(data.get("platform") or "")
+        it.title = data.get("title") or ""
+        it.status = sys.intern(data.get("status") or "")
+        it.banner = data.get("banner") or ""
+        it.link = data.get("link") or ""
+        it.cta = it.starts_at = it.ends_at = None
+        it.extra = None
+        for k, v in data.items():
+            if k not in FIELDS:
+                it[k] = v
+        return it
+
+    # ---------- dict compatibility ----------
+
+    def __getitem__(self, key):
+        if key in FIELDS:
+            return getattr(self, key)
+        if key in OPTIONAL:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _INTERNED and isinstance(value, str):
+            value = sys.intern(value)
+        if key in FIELDS or key in OPTIONAL:
+            setattr(self, key, value)
+            return
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in FIELDS:
+            setattr(self, key, "")
+        elif key in OPTIONAL and getattr(self, key) is not None:
+            setattr(self, key, None)
+        elif self.extra is not None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in OPTIONAL:
+            return getattr(self, key) is not None
+        return key in FIELDS or (self.extra is not None and key in self.extra)
+
+    def get(self, key, default=None):
+        if key in FIELDS:
+            return getattr(self, key)
+        if key in OPTIONAL:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def keys(self):
+        keys = list(FIELDS)
+        keys.extend(k for k in OPTIONAL if getattr(self, k) is not None)
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def to_dict(self) -> dict:
+        d = {k: getattr(self, k) for k in FIELDS}
+        for k in OPTIONAL:
+            value = getattr(self, k)
+            if value is not None:
+                d[k] = value
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"Item({self.platform!r}, {self.title!r})"
+
+
+def json_default(obj):
+    """`default=` hook for json.dumps so Items serialize as plain objects."""
+    if isinstance(obj, Item):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,261 @@
+import os
+import re
+import sys
+import json
+import time
+import queue
+import hashlib
+import smtplib
+import threading
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+
+from ratelimit import TokenBucket
+from preferences import load_preferences, personalized_digests
+
+FROM_NAME = os.getenv("FROM_NAME", "Free Game Bot")
+GMAIL_USER = os.getenv("GMAIL_USER", "")
+GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD", "")
+DASHBOARD_LINK = os.getenv("DASHBOARD_LINK", "https://yourusername.github.io/free_game_notifier/dashboard/dashboard.html")
+EMAIL_SUBJECT = os.getenv("EMAIL_SUBJECT", "🎁 New Free Games Alert!")
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"
+# Concurrent SMTP connections, messages per second across all of them,
+# recipients per BCC message (1 = one personal message each) and an
+# optional recipient cap (0 = no cap).
+MAIL_CONNECTIONS = int(os.getenv("MAIL_CONNECTIONS", "4"))
+MAIL_RATE = float(os.getenv("MAIL_RATE", "10"))
+MAIL_BCC_BATCH = int(os.getenv("MAIL_BCC_BATCH", "1"))
+MAX_SUBS = int(os.getenv("MAX_SUBS", "0"))
+
+SUMMARY_FILE = "drop_summary.txt"
+CHANGES_FILE = "drop_changes.json"
+SUBSCRIBERS_FILE = "subscribers.json"
+JOURNAL_FILE = "mail_journal.jsonl"
+MAX_ATTEMPTS = 3
+
+
+def load_subscribers(path=SUBSCRIBERS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return load_preferences(json.load(f))
+
+
+def load_events(summary, path=CHANGES_FILE):
+    """The structured change set, if it belongs to this summary."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            events = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not events or not all(ev.get("line", "") in summary for ev in events):
+        return None
+    return events
+
+
+def render_bodies(summary_html: str):
+    """Plain-text and HTML bodies, rendered once for every recipient."""
+    text = re.sub(r"<[^>]+>", "", re.sub(r"<br/?>", "\n", summary_html))
+    text += f"\n\nView on dashboard: {DASHBOARD_LINK}"
+    html = (
+        '<div style="font-family:Segoe UI,Arial;padding:8px">'
+        f"{summary_html.replace(chr(10), '<br/>')}"
+        f'<hr/><p><a href="{DASHBOARD_LINK}">View Dashboard</a></p></div>'
+    )
+    return text, html
+
+
+class Journal:
+    """
+    Append-only record of recipients already mailed for one summary.
+    Entries for other summaries are dropped when it is opened, so a crashed
+    send resumes where it stopped and a new summary starts clean.
+    """
+
+    def __init__(self, path, summary_id):
+        self.path = path
+        self.summary_id = summary_id
+        self.done = set()
+        kept = []
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if rec.get("summary") == summary_id:
+                        self.done.add(rec["to"])
+                        kept.append(line if line.endswith("\n") else line + "\n")
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(kept)
+        self.lock = threading.Lock()
+        self.fh = open(path, "a", encoding="utf-8")
+
+    def mark(self, recipients):
+        with self.lock:
+            for to in recipients:
+                self.fh.write(json.dumps({"summary": self.summary_id, "to": to}) + "\n")
+                self.done.add(to)
+            self.fh.flush()
+            os.fsync(self.fh.fileno())
+
+    def close(self):
+        self.fh.close()
+
+
+class SmtpPool:
+    """
+    MAIL_CONNECTIONS workers, each holding one SMTP connection open for the
+    whole run (reconnecting if the server drops it), pulling batches from a
+    shared queue under one global TokenBucket.
+    """
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, user=GMAIL_USER, password=GMAIL_APP_PASSWORD,
+                 starttls=SMTP_STARTTLS, connections=MAIL_CONNECTIONS, rate=MAIL_RATE):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.connections = max(1, connections)
+        self.bucket = TokenBucket(rate, max(1.0, rate))
+        self.stats = {"sent": 0, "failed": 0}
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=30)
+        conn.ehlo()
+        if self.starttls:
+            conn.starttls()
+            conn.ehlo()
+        if self.user and self.password:
+            conn.login(self.user, self.password)
+        return conn
+
+    def _worker(self, jobs, build, journal):
+        conn = None
+        while True:
+            try:
+                batch, bodies = jobs.get_nowait()
+            except queue.Empty:
+                break
+            msg = build(batch, bodies)
+            for attempt in range(MAX_ATTEMPTS):
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    self.bucket.acquire()
+                    conn.send_message(msg, to_addrs=batch)
+                    journal.mark(batch)
+                    with self.lock:
+                        self.stats["sent"] += len(batch)
+                    break
+                except smtplib.SMTPRecipientsRefused as e:
+                    print(f"❌ Refused {', '.join(e.recipients)}")
+                    with self.lock:
+                        self.stats["failed"] += len(batch)
+                    break
+                except (smtplib.SMTPException, OSError) as e:
+                    print(f"[MAIL] {batch[0]}{' +%d' % (len(batch) - 1) if len(batch) > 1 else ''}: {e}")
+                    try:
+                        if conn is not None:
+                            conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+                    if attempt + 1 == MAX_ATTEMPTS:
+                        with self.lock:
+                            self.stats["failed"] += len(batch)
+                    else:
+                        time.sleep(2 ** attempt)
+        if conn is not None:
+            try:
+                conn.quit()
+            except Exception:
+                pass
+
+    def send(self, jobs_list, build, journal):
+        """jobs_list: (recipients, (text, html)) pairs; build(recipients, bodies) -> message."""
+        jobs = queue.Queue()
+        for job in jobs_list:
+            jobs.put(job)
+        workers = [
+            threading.Thread(target=self._worker, args=(jobs, build, journal), name=f"smtp-{i}")
+            for i in range(min(self.connections, max(1, jobs.qsize())))
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        return self.stats
+
+
+def main():
+    if not os.path.exists(SUMMARY_FILE) or not open(SUMMARY_FILE, encoding="utf-8").read().strip():
+        print(f"No {SUMMARY_FILE} or it's empty. Nothing to send.")
+        return 0
+    summary = open(SUMMARY_FILE, encoding="utf-8").read().strip()
+
+    try:
+        subs = load_subscribers()
+    except Exception as e:
+        print(f"Error reading {SUBSCRIBERS_FILE}:", e)
+        return 1
+    if MAX_SUBS and len(subs) > MAX_SUBS:
+        print(f"Limiting recipients to MAX_SUBS={MAX_SUBS}")
+        subs = subs[:MAX_SUBS]
+    if not subs:
+        print(f"No subscribers found in {SUBSCRIBERS_FILE}")
+        return 0
+
+    events = load_events(summary)
+    if events is not None:
+        deliveries = personalized_digests(subs, events)
+        print(f"Personalized digests: {len(deliveries)} variants for "
+              f"{sum(len(r) for _, r in deliveries)}/{len(subs)} subscribers.")
+    else:
+        deliveries = [(summary, [s["email"] for s in subs])]
+
+    sender = GMAIL_USER or "bot@localhost"
+    journal = Journal(JOURNAL_FILE, hashlib.sha256(summary.encode("utf-8")).hexdigest()[:16])
+
+    def build(batch, bodies):
+        text, html = bodies
+        msg = EmailMessage()
+        msg["From"] = formataddr((FROM_NAME, sender))
+        msg["Subject"] = EMAIL_SUBJECT
+        msg["Message-ID"] = make_msgid()
+        # BCC batches are addressed to ourselves; recipients only see their envelope.
+        msg["To"] = batch[0] if len(batch) == 1 else sender
+        msg.set_content(text)
+        msg.add_alternative(html, subtype="html")
+        return msg
+
+    size = max(1, MAIL_BCC_BATCH)
+    jobs = []
+    skipped = 0
+    for digest, recipients in deliveries:
+        pending = [r for r in recipients if r not in journal.done]
+        skipped += len(recipients) - len(pending)
+        bodies = render_bodies(digest)
+        jobs.extend((pending[i:i + size], bodies) for i in range(0, len(pending), size))
+    if skipped:
+        print(f"Resuming: {skipped} recipients already mailed for this summary.")
+
+    started = time.monotonic()
+    try:
+        stats = SmtpPool().send(jobs, build, journal)
+    finally:
+        journal.close()
+    elapsed = time.monotonic() - started
+    print(
+        f"Done sending: sent={stats['sent']} failed={stats['failed']} "
+        f"in {elapsed:.1f}s ({stats['sent'] / elapsed if elapsed else 0:.1f} recipients/s)"
+    )
+    return 1 if stats["failed"] and not stats["sent"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,67 @@
 import os
+import re
+import sys
+import argparse
+import gzip
 import json
+import html as html_lib
+import hashlib
+import time
+import threading
+import importlib.util
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import pytz
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+import replay
+from fileio import write_if_changed
+from http_client import HttpClient, call_deadline
+from metrics import METRICS
+from source_health import SourceHealth
+from identity import normalize_title, canonical_link
+from duplicates import link_duplicates
+from item import Item, json_default
+from history import HistoryStore
+from images import ImageCache
+from steam_store import SteamStore
+from api_server import CHANGE_LOG_FILE, append_change_set
+import feeds
+from telegram_delivery import TelegramDelivery
+from scheduler import parse_time, plan_next_run, save_plan
 
 # === CONFIG ===
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "PLACEHOLDER_BOT_TOKEN")
+# One chat id, or several separated by commas to fan out to many channels.
 CHANNEL_ID = os.getenv("TELEGRAM_CHANNEL_ID", "PLACEHOLDER_CHANNEL_ID")
 DASHBOARD_TEMPLATE = "dashboard/template_dashboard.html"
 DASHBOARD_FILE = "dashboard/dashboard.html"
 DATA_FILE = "game_data.json"
 DROPS_FILE = "drops.json"
-ARCHIVE_FILE = "monthly_archive.json"
+DROPS_VERSION_FILE = "drops.version.json"
+ARCHIVE_FILE = "monthly_archive.json"  # legacy; imported into HISTORY_DB once
+HISTORY_DB = "history.db"
 SUMMARY_FILE = "drop_summary.txt"
+CHANGES_FILE = "drop_changes.json"
 
 PRIME_WITH_LINK = "prime_gaming.json"
 PRIME_SKIPPED = "prime_gaming_skipped.json"
 
-INDIAN_TZ = pytz.timezone("Asia/Kolkata")
+# Platform order on the dashboard (kept in sync with dashboard/dashboard.js).
+PLATFORM_ORDER = ["Epic Games Store", "Prime Gaming", "Steam", "GOG", "Humble", "Ubisoft"]
+
+# Time zone for human-facing timestamps (dashboard, summaries, history months).
+DISPLAY_TZ = pytz.timezone(os.getenv("DISPLAY_TZ", "Asia/Kolkata"))
+# Countries region-dependent sources (EGS, GOG) are fetched for, e.g. REGIONS="IN,US,DE".
+# Each gets its own drops.<REGION>.json view next to the combined drops.json.
+REGIONS = [r.strip().upper() for r in os.getenv("REGIONS", "IN").split(",") if r.strip()] or ["IN"]
+DROPS_REGION_FILE = "drops.{region}.json"
 DASHBOARD_LINK = os.getenv("DASHBOARD_LINK", "https://yourusername.github.io/free_game_notifier/dashboard/dashboard.html")
+# Site root the change feeds are published under (feeds/*.xml, feeds/feed.json).
+FEED_BASE_URL = os.getenv("FEED_BASE_URL") or DASHBOARD_LINK.rsplit("/dashboard/", 1)[0]
+
+# Whole-run budget (seconds) for the concurrent scrape stage.
+RUN_BUDGET = float(os.getenv("RUN_BUDGET", "120"))
 
 HEADERS = {
     "User-Agent": (
@@ -34,8 +75,30 @@ HEADERS = {
     "Connection": "keep-alive",
 }
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# lxml is BeautifulSoup's C-accelerated tree builder; only probed here, since
+# bs4 itself is imported by the first scraper that parses HTML.
+_DEFAULT_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# HTML_PARSER picks the bs4 tree builder; PARSE_ONLY=0 builds full-page trees again.
+HTML_PARSER = os.getenv("HTML_PARSER", _DEFAULT_PARSER)
+PARSE_ONLY = os.getenv("PARSE_ONLY", "1") != "0"
+
+# Pagination: pages fetched at once per source, and a safety cap on pages walked.
+PAGE_CONCURRENCY = int(os.getenv("PAGE_CONCURRENCY", "4"))
+MAX_PAGES = int(os.getenv("MAX_PAGES", "25"))
+GOG_PAGE_SIZE = 48
+
+# Shared pooled client used by every scraper (retries + conditional-request cache).
+HTTP = HttpClient(headers=HEADERS, max_per_host=PAGE_CONCURRENCY)
+STEAM_STORE = SteamStore(HTTP)
+
 def now_str() -> str:
-    return datetime.now(INDIAN_TZ).strftime("%Y-%m-%d %H:%M:%S %Z")
+    return datetime.now(DISPLAY_TZ).strftime("%Y-%m-%d %H:%M:%S %Z")
 
 # ------------------ UTILITIES ------------------
 
@@ -48,9 +111,176 @@ def load_json(path: str, default):
         print(f"load_json error for {path}:", e)
     return default
 
-def save_json(path: str, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def save_json(path: str, data, compact: bool = False) -> bool:
+    if compact:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=json_default)
+    else:
+        text = json.dumps(data, indent=2, ensure_ascii=False, default=json_default)
+    return write_if_changed(path, text.encode("utf-8"))
+
+def publish_json(path: str, data):
+    """
+    Writes a minified JSON file for the dashboard together with
+    precompressed .gz and (when brotli is installed) .br siblings.
+    The gzip header carries no timestamp, so unchanged data stays
+    byte-identical and nothing is rewritten.
+    Returns (changed, version) where version is a short content hash.
+    """
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8")
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    changed = write_if_changed(path, raw)
+    if changed or not os.path.exists(path + ".gz"):
+        write_if_changed(path + ".gz", gzip.compress(raw, compresslevel=9, mtime=0))
+        if brotli is not None:
+            write_if_changed(path + ".br", brotli.compress(raw, quality=11))
+    return changed, version
+
+def make_soup(html: str, only: tuple = None):
+    """
+    Parses html with the configured backend.
+    When `only` is given (and PARSE_ONLY is on) just the matching subtrees
+    are built, which keeps parse CPU and memory proportional to the cards
+    we read rather than to the whole page.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+    parse_only = SoupStrainer(only[0], **only[1]) if only and PARSE_ONLY else None
+    try:
+        return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only)
+    except Exception as e:
+        if HTML_PARSER == "html.parser":
+            raise
+        print(f"[PARSER] {HTML_PARSER} failed ({e}); falling back to html.parser")
+        return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+def has_class(name: str):
+    """
+    SoupStrainer filter for one class token. A plain string only matches
+    when the whole class attribute equals it, so an element with an extra
+    class would be dropped before select() ever saw it.
+    """
+    def match(value):
+        if not value:
+            return False
+        return name in (value.split() if isinstance(value, str) else value)
+    return match
+
+# Subtrees each scraper actually reads, as SoupStrainer(name, **kwargs) arguments.
+STEAM_ROWS = ("tr", {"attrs": {"class": has_class("app"), "data-appid": True}})
+HUMBLE_CARDS = (None, {"class_": has_class("entity-block-container")})
+UBISOFT_ARTICLES = ("article", {"class_": has_class("news-list-article")})
+PRIME_CARDS = ("div", {"attrs": {"data-a-target": "item-card"}})
+
+def iso_utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+_COUNTDOWN = re.compile(r"(?:(\d+)\s*d(?:ays?)?[\s,]*)?(\d{1,2}):(\d{2}):(\d{2})")
+_RELATIVE = re.compile(r"(\d+)\s*(week|day|hour|hr|minute|min)s?\b", re.I)
+_RELATIVE_UNITS = {"week": 604800, "day": 86400, "hour": 3600, "hr": 3600, "minute": 60, "min": 60}
+_EXPIRY_NOISE = re.compile(r"^\s*(?:ends|ending|expires|offer ends)\s*(?:on|in|at)?\s*|\s*(?:left|remaining)\s*$", re.I)
+
+def parse_expiry(text: str, now: datetime = None):
+    """
+    Best-effort end time (ISO 8601, UTC) from free-form promo text such as
+    Humble's "01:22:05" / "2 days left" countdowns or Prime's
+    "Ends in 3 days" / "Ends Oct 20" footers. Returns None when unsure.
+    """
+    text = (text or "").strip()
+    if not text:
+        return None
+    now = now or datetime.now(timezone.utc)
+
+    m = _COUNTDOWN.search(text)
+    if m:
+        days, h, mi, sec = (int(x or 0) for x in m.groups())
+        return iso_utc(now + timedelta(days=days, hours=h, minutes=mi, seconds=sec))
+
+    relative = _RELATIVE.findall(text)
+    if relative:
+        seconds = sum(int(n) * _RELATIVE_UNITS[u.lower()] for n, u in relative)
+        return iso_utc(now + timedelta(seconds=seconds))
+
+    try:
+        import dateparser  # slow to import; only needed for absolute dates
+    except ImportError:
+        return None
+    parsed = dateparser.parse(
+        _EXPIRY_NOISE.sub("", text),
+        settings={"PREFER_DATES_FROM": "future", "RETURN_AS_TIMEZONE_AWARE": True,
+                  "RELATIVE_BASE": now.replace(tzinfo=None), "TIMEZONE": "UTC"},
+    )
+    if parsed is None or parsed < now:
+        return None
+    return iso_utc(parsed)
+
+def egs_promo_window(game: dict):
+    """(starts_at, ends_at) of the current 100%-off promotion of an EGS element."""
+    promos = (game.get("promotions") or {}).get("promotionalOffers") or []
+    for block in promos:
+        for offer in block.get("promotionalOffers") or []:
+            if (offer.get("discountSetting") or {}).get("discountPercentage") == 0:
+                start, end = parse_time(offer.get("startDate")), parse_time(offer.get("endDate"))
+                return (iso_utc(start) if start else None), (iso_utc(end) if end else None)
+    return None, None
+
+def paginate(fetch_page, first_page: int = 1, max_pages: int = MAX_PAGES,
+             concurrency: int = PAGE_CONCURRENCY):
+    """
+    Streams items from a paged source.
+    `fetch_page(n)` returns (items, has_more). Up to `concurrency` pages are
+    in flight at once, items are yielded in page order as soon as their page
+    is done, and the walk stops at the first page with no qualifying items
+    or that reports no more pages. A failure after the first page keeps
+    what was already yielded.
+    """
+    last_page = first_page + max_pages - 1
+    fetch_page = METRICS.carry_source(fetch_page)
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="page")
+    in_flight = deque()
+    next_page = first_page
+    try:
+        while next_page <= last_page and len(in_flight) < concurrency:
+            in_flight.append((next_page, pool.submit(fetch_page, next_page)))
+            next_page += 1
+        while in_flight:
+            page, fut = in_flight.popleft()
+            try:
+                items, has_more = fut.result()
+            except Exception as e:
+                if page == first_page:
+                    raise
+                print(f"[PAGINATE] page {page} failed, stopping: {e}")
+                return
+            yield from items
+            if not items or not has_more:
+                return
+            if next_page <= last_page:
+                in_flight.append((next_page, pool.submit(fetch_page, next_page)))
+                next_page += 1
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def fetch_regions(fetch_region, regions=None):
+    """
+    Runs `fetch_region(country)` for every region at once and merges
+    identical offers (same identity as in the diff) into one item whose
+    "regions" lists the countries it is free in. One region failing fails
+    the source, so its last-known-good result is served rather than a
+    partial set of regions.
+    """
+    regions = regions or REGIONS
+    with ThreadPoolExecutor(max_workers=len(regions), thread_name_prefix="region") as pool:
+        per_region = list(pool.map(METRICS.carry_source(fetch_region), regions))
+    merged = {}
+    for region, items in zip(regions, per_region):
+        for key, (_, it) in index_items({"": items}).items():
+            if key not in merged:
+                merged[key] = dict(it, regions=[])
+            merged[key]["regions"].append(region)
+    return list(merged.values())
+
+def region_view(items, region: str):
+    """Items available in `region`; items without a "regions" list apply everywhere."""
+    return [it for it in items if region in it.get("regions", (region,))]
 
 def ensure_link_and_cta(item, default_cta=None):
     """
@@ -66,39 +296,228 @@ def ensure_link_and_cta(item, default_cta=None):
             item["cta"] = default_cta
     return item
 
-def compare_and_build(old: dict, new: dict):
+def index_items(grouped: dict) -> dict:
     """
-    Build human-readable change log & maintain monthly archive.
-    Only cares about new and expired titles.
-    Ignores status changes because dashboard only tracks fresh drops.
+    Maps a stable identity to every item of a grouped snapshot.
+    Identity is platform + canonical link (so a renamed listing keeps its
+    identity), or platform + normalized title when there is no link. Two
+    items that still collide are told apart by their normalized title.
     """
-    changes = []
-    monthly = load_json(ARCHIVE_FILE, {})
-    cur_month = datetime.now(INDIAN_TZ).strftime("%Y-%m")
-    if cur_month not in monthly:
-        monthly[cur_month] = []
-
-    for src, new_items in new.items():
-        old_items = old.get(src, [])
+    index = {}
+    for src, items in grouped.items():
+        for it in items or []:
+            link = canonical_link(it.get("link"))
+            norm = normalize_title(it.get("title"))
+            key = f"{src}|{link}" if link else f"{src}|title:{norm}"
+            if key in index:
+                key = f"{key}|{norm}"
+            index[key] = (src, it)
+    return index
+
+def carry_over_expiry(old: dict, new: dict):
+    """
+    Relative countdowns ("Ends in 3 days") would yield a slightly different
+    ends_at on every run. Keep the previously parsed time while an item's
+    status text is unchanged, so unchanged drops stay byte-identical.
+    """
+    old_idx = index_items(old)
+    for key, (_, it) in index_items(new).items():
+        prev = old_idx.get(key)
+        if prev is None:
+            continue
+        prev_it = prev[1]
+        if prev_it.get("ends_at") and prev_it.get("status") == it.get("status"):
+            it["ends_at"] = prev_it["ends_at"]
+
+def linked_keys(grouped: dict) -> set:
+    """
+    Identity keys of listings folded into another platform's drop (its
+    claim_links), which are still live even though they have no item.
+    """
+    keys = set()
+    for src, items in grouped.items():
+        for it in items or []:
+            for claim in it.get("claim_links") or ():
+                link = canonical_link(claim.get("link"))
+                if link and claim.get("platform") != src:
+                    keys.add(f"{claim.get('platform')}|{link}")
+    return keys
 
-        old_titles = {i["title"] for i in old_items}
-        new_titles = {i["title"] for i in new_items}
+def diff_snapshots(old: dict, new: dict):
+    """
+    O(n) diff of two grouped snapshots keyed on item identity.
+    Returns (added, removed, changed): lists of (key, src, item) for the
+    first two and (key, src, old_item, new_item) for items whose
+    title/status moved. A listing folded into another drop on one side and
+    standing alone on the other is neither added nor removed.
+    """
+    old_idx = index_items(old)
+    new_idx = index_items(new)
+    old_linked = linked_keys(old)
+    new_linked = linked_keys(new)
+
+    added = [(k, src, it) for k, (src, it) in new_idx.items() if k not in old_idx and k not in old_linked]
+    removed = [(k, src, it) for k, (src, it) in old_idx.items() if k not in new_idx and k not in new_linked]
+    changed = []
+    for k, (src, it) in new_idx.items():
+        prev = old_idx.get(k)
+        if prev is None:
+            continue
+        prev_it = prev[1]
+        if prev_it.get("title") != it.get("title") or prev_it.get("status") != it.get("status"):
+            changed.append((k, src, prev_it, it))
+    return added, removed, changed
+
+def open_history() -> HistoryStore:
+    """Opens the history store, importing the legacy monthly archive on first use."""
+    store = HistoryStore(HISTORY_DB)
+    if store.is_empty() and os.path.exists(ARCHIVE_FILE):
+        n = store.migrate_monthly_archive(ARCHIVE_FILE)
+        print(f"[HISTORY] Migrated {n} entries from {ARCHIVE_FILE}")
+    return store
 
-        expired_titles = old_titles - new_titles
-        for g in expired_titles:
-            changes.append(f"🔻 Expired: <b>{src}</b> – {g}")
+def compare_and_build(old: dict, new: dict):
+    """
+    Build human-readable change log & record drops in the history store.
+    Only cares about new and expired titles.
+    Ignores status changes because dashboard only tracks fresh drops;
+    renames of the same listing are logged but not notified.
+    Returns (changes, events): the message lines, and the same changes as
+    structured records for per-subscriber digests.
+    """
+    events = []
+    added, removed, changed = diff_snapshots(old, new)
+
+    def event(kind, key, src, it, line):
+        also = [c["platform"] for c in it.get("claim_links") or () if c["platform"] != src]
+        if also:
+            line += f" (also on {', '.join(also)})"
+        banner = it.get("banner") or ""
+        events.append({
+            "event": kind, "key": key, "platform": src, "platforms": [src] + also,
+            "title": it.get("title") or "", "link": it.get("link") or "", "line": line,
+            "image": banner if banner.startswith("http") else "", "ends_at": it.get("ends_at"),
+        })
+
+    for key, src, it in removed:
+        event("expired", key, src, it, f"🔻 Expired: <b>{src}</b> – {it.get('title')}")
+
+    for _, src, prev_it, it in changed:
+        if prev_it.get("title") != it.get("title"):
+            print(f"[DIFF] Renamed on {src}: {prev_it.get('title')!r} -> {it.get('title')!r}")
+
+    for key, src, it in added:
+        event("new", key, src, it, f"🟢 New Freebie: <b>{src}</b> – {it.get('title')}")
+    changes = [e["line"] for e in events]
+
+    # Opened on every run, not only when something changed: the store is
+    # synced to the snapshot, so every live drop has an open row (including
+    # those already up when it was created) and every open row is live. A
+    # listing that was folded into another drop and then went away with it
+    # never shows up in `removed`, so rows are closed by that sync instead.
+    now = datetime.now(DISPLAY_TZ)
+    live = index_items(new)
+    store = open_history()
+    try:
+        active = store.active_keys()
+        store.record_removed(active - live.keys() - linked_keys(new), now)
+        missing = [(k, src, it) for k, (src, it) in live.items() if k not in active]
+        store.record_added(missing, now)
+        added_keys = {k for k, _, _ in added}
+        untracked = sum(1 for k, _, _ in missing if k not in added_keys)
+        if untracked:
+            print(f"[HISTORY] Recorded {untracked} live drop(s) the store had no row for")
+    finally:
+        store.close()
+    return changes, events
+
+def publish_feeds(events: list, drops_version: str, now: datetime = None) -> bool:
+    """
+    Folds this run's change events into the RSS, Atom and JSON Feed
+    documents and refreshes their manifest. The JSON Feed doubles as the
+    window's state, so each run only adds its own entries. Returns True
+    when any feed document changed.
+    """
+    now = now or datetime.now(timezone.utc)
+    paths = {kind: os.path.join(feeds.FEED_DIR, name) for kind, name in feeds.FEED_FILES.items()}
+    manifest_path = os.path.join(feeds.FEED_DIR, feeds.MANIFEST_FILE)
+    entries = load_json(paths["json"], {}).get("items") or []
+    if events:
+        entries = feeds.merge_entries(entries, events, now, FEED_BASE_URL)
+    docs = {kind: render(entries, FEED_BASE_URL) for kind, render in feeds.RENDERERS.items()}
+    changed = False
+    for kind, data in docs.items():
+        changed |= write_if_changed(paths[kind], data)
+    manifest = feeds.build_manifest(docs, load_json(manifest_path, {}), entries, now,
+                                    snapshot={"path": DROPS_FILE, "version": drops_version})
+    save_json(manifest_path, manifest)
+    return changed
+
+def format_update(lines) -> str:
+    """The Telegram/email update message for a list of change lines."""
+    return (
+        "🗞 <b>Free Game Update</b> 🗞\n\n"
+        + "\n".join(lines)
+        + f"\n\n🌐 <a href=\"{DASHBOARD_LINK}\">Dashboard</a>"
+    )
 
-        fresh_titles = new_titles - old_titles
-        for g in fresh_titles:
-            changes.append(f"🟢 New Freebie: <b>{src}</b> – {g}")
-            if g not in monthly[cur_month]:
-                monthly[cur_month].append(g)
+def sort_platforms(platforms):
+    """Same order dashboard.js uses: known platforms first, the rest after."""
+    rank = {p: i for i, p in enumerate(PLATFORM_ORDER)}
+    return sorted(platforms, key=lambda p: rank.get(p, len(PLATFORM_ORDER)))
+
+def render_card(game: dict) -> str:
+    esc = html_lib.escape
+    link = game.get("link") or ""
+    clickable = link.startswith("http")
+    title = esc(game.get("title") or "")
+    # thumb paths are from the site root; the dashboard sits one level down.
+    banner = ("../" + game["thumb"]) if game.get("thumb") else game.get("banner") or ""
+    srcset = ", ".join("../" + s for s in game["thumb_srcset"].split(", ")) if game.get("thumb_srcset") else ""
+    srcset_attr = f' srcset="{esc(srcset)}" sizes="220px"' if srcset else ""
+    banner_html = (
+        f'<img src="{esc(banner)}"{srcset_attr} alt="{title}" loading="lazy" onerror="this.style.display=\'none\'">'
+        if banner else ""
+    )
+    claims = game.get("claim_links") or []
+    if len(claims) > 1:
+        # One card, one button per store it can be claimed on.
+        open_tag = '<div class="card">'
+        close_tag = "</div>"
+        cta_html = "".join(
+            f'<a class="badge" href="{esc(c["link"])}" target="_blank" rel="noopener noreferrer">'
+            f'Claim on {esc(c["platform"])}</a>'
+            for c in claims
+        )
+    elif clickable:
+        open_tag = f'<a class="card" href="{esc(link)}" target="_blank" rel="noopener noreferrer">'
+        close_tag = "</a>"
+        cta_html = '<span class="badge">Claim Now</span>'
+    else:
+        open_tag = '<div class="card disabled">'
+        close_tag = "</div>"
+        cta = esc(game.get("cta") or "See official site for details")
+        cta_html = f'<span class="badge">🔒</span><span class="cta-text">{cta}</span>'
+    return (
+        f"{open_tag}{banner_html}<div class=\"card-content\"><h4>{title}</h4>"
+        f"<p>{esc(game.get('status') or 'Free Now')}</p><div class=\"cta\">{cta_html}</div></div>{close_tag}"
+    )
 
-    save_json(ARCHIVE_FILE, monthly)
-    return changes
+def render_game_blocks(grouped: dict) -> str:
+    """Pre-renders the platform sections exactly as dashboard.js would."""
+    sections = []
+    for platform in sort_platforms(p for p, items in grouped.items() if items):
+        cards = "".join(render_card(g) for g in grouped[platform])
+        sections.append(
+            f'<section class="platform"><h2 class="platform-title">{html_lib.escape(platform)}</h2>'
+            f'<div class="cards">{cards}</div></section>'
+        )
+    if not sections:
+        return "<p>No free games found at the moment. Check back later!</p>"
+    return "\n".join(sections)
 
-def build_dashboard(grouped: dict):
-    now = datetime.now(INDIAN_TZ).strftime("%Y-%m-%d %H:%M %Z")
+def build_dashboard(grouped: dict, version: str = ""):
+    now = datetime.now(DISPLAY_TZ).strftime("%Y-%m-%d %H:%M %Z")
 
     if not os.path.exists(DASHBOARD_TEMPLATE):
         blocks = ""
@@ -115,244 +534,303 @@ def build_dashboard(grouped: dict):
                     cta = it.get("cta") or f"Claim on the {src} website"
                     blocks += f"<li>{img}<strong>{title}</strong> — {status} <em>({cta})</em></li>"
             blocks += "</ul>"
-        with open(DASHBOARD_FILE, "w", encoding="utf-8") as f:
-            f.write(f"<html><body><h1>Free Game Tracker</h1><p>{now}</p>{blocks}</body></html>")
+        page = f"<html><body><h1>Free Game Tracker</h1><p>{now}</p>{blocks}</body></html>"
+        write_if_changed(DASHBOARD_FILE, page.encode("utf-8"))
         return
 
     tpl = open(DASHBOARD_TEMPLATE, "r", encoding="utf-8").read()
-    html = tpl.replace("{{TIMESTAMP}}", now).replace("{{GAME_BLOCKS}}", "")
-    os.makedirs(os.path.dirname(DASHBOARD_FILE), exist_ok=True)
-    with open(DASHBOARD_FILE, "w", encoding="utf-8") as f:
-        f.write(html)
+    html = (
+        tpl.replace("{{TIMESTAMP}}", now)
+        .replace("{{GAME_BLOCKS}}", render_game_blocks(grouped))
+        .replace("{{DATA_VERSION}}", html_lib.escape(version))
+    )
+    write_if_changed(DASHBOARD_FILE, html.encode("utf-8"))
+
+# One delivery engine for the whole process, so the daemon keeps its pooled
+# session and its rate limits hold across publishes.
+TELEGRAM = None if BOT_TOKEN.startswith("PLACEHOLDER") else TelegramDelivery(
+    BOT_TOKEN, [c.strip() for c in CHANNEL_ID.split(",") if c.strip()])
 
 def send_telegram(msg_html: str):
-    if BOT_TOKEN.startswith("PLACEHOLDER"):
+    if TELEGRAM is None:
         print("Telegram not configured. Skipping send.")
         return
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": CHANNEL_ID,
-        "text": msg_html,
-        "parse_mode": "HTML",
-        "disable_web_page_preview": True
-    }
     try:
-        response = requests.post(url, data=payload, timeout=10)
-        print(f"Telegram API response status: {response.status_code}")
-        print(f"Telegram API response body: {response.text}")
-        
-        if response.status_code != 200 or not response.json().get("ok"):
-            print("[ERROR] Telegram message failed to send.")
-
+        outcome = TELEGRAM.broadcast(msg_html)
+        TELEGRAM.report()
+        for chat_id, ok in outcome.items():
+            if not ok:
+                print(f"[ERROR] Telegram message failed to send to {chat_id}.")
     except Exception as e:
         print("Telegram send error (Exception):", e)
 
 # ------------------ SCRAPERS ------------------
 
-def get_egs_free():
+def parse_egs(data: dict):
     """
-    Epic Games Store free weekly games via official API.
+    Free offers from a freeGamesPromotions response.
     DEFINITIVE version: Searches multiple locations for the page slug.
     """
     out = []
-    try:
-        url = (
-            "https://store-site-backend-static.ak.epicgames.com/freeGamesPromotions"
-            "?locale=en-US&country=IN&allowCountries=IN"
-        )
-        r = requests.get(url, headers=HEADERS, timeout=20).json()
-        elements = r.get("data", {}).get("Catalog", {}).get("searchStore", {}).get("elements", [])
+    elements = data.get("data", {}).get("Catalog", {}).get("searchStore", {}).get("elements", [])
+    
+    for g in elements:
+        price = g.get("price", {}).get("totalPrice", {}).get("discountPrice", 1)
         
-        for g in elements:
-            price = g.get("price", {}).get("totalPrice", {}).get("discountPrice", 1)
-            
-            if price != 0:
-                continue
-
-            title = g.get("title", "Unknown Game")
-            banner = ""
-            if g.get("keyImages"):
-                for img in g["keyImages"]:
-                    if img.get("type") == "OfferImageWide":
-                        banner = img.get("url", "")
-                        break
-                if not banner and g["keyImages"]:
-                    banner = g["keyImages"][0].get("url", "")
-
-            slug = None
-            
-            if g.get("offerMappings"):
-                for mapping in g["offerMappings"]:
-                    if mapping.get("pageSlug"):
-                        slug = mapping["pageSlug"]
-                        break
-            
-            if not slug and g.get("catalogNs", {}).get("mappings"):
-                 for mapping in g["catalogNs"]["mappings"]:
-                    if mapping.get("pageSlug"):
-                        slug = mapping["pageSlug"]
-                        break
-            
-            if not slug:
-                slug = g.get("productSlug") or g.get("urlSlug")
+        if price != 0:
+            continue
+
+        title = g.get("title", "Unknown Game")
+        banner = ""
+        if g.get("keyImages"):
+            for img in g["keyImages"]:
+                if img.get("type") == "OfferImageWide":
+                    banner = img.get("url", "")
+                    break
+            if not banner and g["keyImages"]:
+                banner = g["keyImages"][0].get("url", "")
+
+        slug = None
+        
+        if g.get("offerMappings"):
+            for mapping in g["offerMappings"]:
+                if mapping.get("pageSlug"):
+                    slug = mapping["pageSlug"]
+                    break
+        
+        if not slug and g.get("catalogNs", {}).get("mappings"):
+             for mapping in g["catalogNs"]["mappings"]:
+                if mapping.get("pageSlug"):
+                    slug = mapping["pageSlug"]
+                    break
+        
+        if not slug:
+            slug = g.get("productSlug") or g.get("urlSlug")
 
-            final_slug = (slug or "").strip().replace("/home", "")
-            link = f"https://store.epicgames.com/p/{final_slug}" if final_slug else ""
-            
-            item = {
-                "platform": "Epic Games Store",
-                "title": title,
-                "status": "Fresh Drop",
-                "banner": banner,
-                "link": link
-            }
-            out.append(ensure_link_and_cta(item, "Claim on Epic Games Store"))
+        final_slug = (slug or "").strip().replace("/home", "")
+        link = f"https://store.epicgames.com/p/{final_slug}" if final_slug else ""
+        
+        item = {
+            "platform": "Epic Games Store",
+            "title": title,
+            "status": "Fresh Drop",
+            "banner": banner,
+            "link": link
+        }
+        starts_at, ends_at = egs_promo_window(g)
+        if starts_at:
+            item["starts_at"] = starts_at
+        if ends_at:
+            item["ends_at"] = ends_at
+        out.append(ensure_link_and_cta(item, "Claim on Epic Games Store"))
+    return out
 
+def _egs_region(country: str):
+    """Epic Games Store free weekly games via official API, for one country."""
+    try:
+        url = "https://store-site-backend-static.ak.epicgames.com/freeGamesPromotions"
+        params = {"locale": "en-US", "country": country, "allowCountries": country}
+        with METRICS.span("fetch"):
+            resp = HTTP.get(url, params=params, timeout=20)
+            resp.raise_for_status()
+        with METRICS.span("parse"):
+            return parse_egs(resp.json())
     except Exception as e:
-        print("EGS error:", e)
-    return out
+        print(f"EGS error ({country}):", e)
+        raise
+
+def get_egs_free():
+    """Epic Games Store free games across REGIONS, merged per offer."""
+    return fetch_regions(_egs_region)
+
+def _gog_page(page: int, country: str = None):
+    url = "https://catalog.gog.com/v1/catalog"
+
+    params = {
+        "limit": GOG_PAGE_SIZE,
+        "page": page,
+        "order": "desc:popularity",
+        "price": "free",
+        "productType": "GAME",
+        "countryCode": country or REGIONS[0],
+    }
+
+    api_headers = {
+        "Accept": "application/json",
+        "Referer": "https://www.gog.com/",
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/115.0.0.0 Safari/537.36"
+        ),
+    }
+
+    with METRICS.span("fetch"):
+        response = HTTP.get(url, params=params, headers=api_headers, timeout=20)
+
+    if response.status_code != 200:
+        print(f"[GOG ERROR] Page {page} ({country or REGIONS[0]}) failed with status code {response.status_code}.")
+        response.raise_for_status()
+        return [], False
+
+    with METRICS.span("parse"):
+        data = response.json()
+        items = parse_gog(data)
+    print(f"[GOG] Found {len(data.get('products', []))} products on page {page} ({country or REGIONS[0]}).")
+    return items, page < int(data.get("pages") or 1)
+
+def parse_gog(data: dict):
+    """Free games from one page of the GOG catalog API."""
+    items = []
+    for product in data.get("products", []):
+        title = product.get("title", "Unknown Game")
+        image_id = product.get("coverHorizontal", "")
+        banner = f"https://images-1.gog-statics.com/{image_id}_product_tile_256.jpg" if image_id else ""
+        slug = product.get("slug", "")
+        link = f"https://www.gog.com/en/game/{slug}" if slug else ""
+
+        item = {
+            "platform": "GOG", "title": title, "status": "Fresh Drop",
+            "banner": banner, "link": link
+        }
+        if title:
+            items.append(ensure_link_and_cta(item, "Claim directly on GOG"))
+    return items
 
 def get_gog_free():
     """
     Fetches free games from GOG using their official backend API.
-    This version uses dedicated API headers and improved debugging.
+    Walks every catalogue page (the API already filters on price=free)
+    for each of REGIONS.
     """
     out = []
     print("[GOG] Starting GOG API fetch...")
 
     try:
-        url = "https://catalog.gog.com/v1/catalog"
-
-        params = {
-            "limit": 24,
-            "order": "desc:popularity",
-            "price": "free",
-            "productType": "GAME",
-        }
-
-        api_headers = {
-            "Accept": "application/json",
-            "Referer": "https://www.gog.com/",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/115.0.0.0 Safari/537.36"
-            ),
-        }
-
-        response = requests.get(url, params=params, headers=api_headers, timeout=20)
-
-        print(f"[GOG DEBUG] Status Code: {response.status_code}")
-        print(f"[GOG DEBUG] Response Text: {response.text[:500]}...")
-
-        if response.status_code == 200:
-            data = response.json()
-            products = data.get("products", [])
-            print(f"[GOG] Found {len(products)} products in API response.")
-
-            for product in products:
-                title = product.get("title", "Unknown Game")
-                image_id = product.get("coverHorizontal", "")
-                banner = f"https://images-1.gog-statics.com/{image_id}_product_tile_256.jpg" if image_id else ""
-                slug = product.get("slug", "")
-                link = f"https://www.gog.com/en/game/{slug}" if slug else ""
-
-                item = {
-                    "platform": "GOG", "title": title, "status": "Fresh Drop",
-                    "banner": banner, "link": link
-                }
-                if title:
-                    out.append(ensure_link_and_cta(item, "Claim directly on GOG"))
-        else:
-            print(f"[GOG ERROR] API request failed with status code {response.status_code}.")
-
+        out.extend(fetch_regions(lambda country: list(paginate(lambda page: _gog_page(page, country)))))
     except requests.exceptions.JSONDecodeError:
         print("[GOG ERROR] Failed to decode JSON. The response was not valid JSON.")
+        raise
     except Exception as e:
         print(f"[GOG ERROR] An unexpected error occurred: {e}")
+        raise
 
     return out
 
 def get_steam_free():
     """
     Steam free 100% off (SteamDB page).
-    UPDATED to be more robust at finding the store page link.
+    SteamDB serves every matching sale in one table, so all rows are read;
+    banners, end times and app types then come from the store API in
+    batches, through the appid cache.
     """
-    out = []
     try:
-        html = requests.get("https://steamdb.info/sales/?min_discount=100", headers=HEADERS, timeout=20).text
-        soup = BeautifulSoup(html, "html.parser")
-        rows = soup.select("tr.app[data-appid]")
-        for r in rows[:10]:
-            title_cell = r.select_one("td:nth-of-type(3)")
-            if not title_cell:
-                continue
+        with METRICS.span("fetch"):
+            resp = HTTP.get("https://steamdb.info/sales/?min_discount=100", timeout=20)
+            resp.raise_for_status()
+        with METRICS.span("parse"):
+            items = parse_steamdb(resp.text)
+        with METRICS.span("enrich"):
+            STEAM_STORE.enrich(items)
+            STEAM_STORE.save()
+        return items
+    except Exception as e:
+        print("Steam error:", e)
+        raise
 
-            title = title_cell.get_text(strip=True)
-            link_tag = title_cell.find("a", href=True)
-            link = ""
+def parse_steamdb(html: str):
+    """Rows of the SteamDB sales table."""
+    out = []
+    soup = make_soup(html, STEAM_ROWS)
+    rows = soup.select("tr.app[data-appid]")
+    for r in rows:
+        title_cell = r.select_one("td:nth-of-type(3)")
+        if not title_cell:
+            continue
 
-            if link_tag and 'store.steampowered.com' in link_tag['href']:
-                link = link_tag['href']
+        title = title_cell.get_text(strip=True)
+        link_tag = title_cell.find("a", href=True)
+        link = ""
 
-            if title:
-                item = {
-                    "platform": "Steam",
-                    "title": title,
-                    "status": "Fresh Drop",
-                    "banner": "",
-                    "link": link
-                }
-                out.append(ensure_link_and_cta(item, "Claim on Steam"))
+        if link_tag and 'store.steampowered.com' in link_tag['href']:
+            link = link_tag['href']
 
-    except Exception as e:
-        print("Steam error:", e)
+        if title:
+            item = {
+                "platform": "Steam",
+                "title": title,
+                "status": "Fresh Drop",
+                "banner": "",
+                "link": link,
+                "appid": r.get("data-appid") or "",
+            }
+            out.append(ensure_link_and_cta(item, "Claim on Steam"))
     return out
 
-def get_humble_free():
-    out = []
-    try:
-        url = "https://www.humblebundle.com/store/search?sort=discount&filter=onsale"
-        html = requests.get(url, headers=HEADERS, timeout=20).text
-        soup = BeautifulSoup(html, "html.parser")
-
-        for card in soup.select(".entity-block-container"):
-            discount_elem = card.select_one(".discount-amount")
-            discount_text = discount_elem.get_text(strip=True) if discount_elem else ""
-            if discount_text != "-100%":
-                continue
+def _humble_page(page: int):
+    url = f"https://www.humblebundle.com/store/search?sort=discount&filter=onsale&page={page}"
+    with METRICS.span("fetch"):
+        resp = HTTP.get(url, timeout=20)
+        resp.raise_for_status()
+    with METRICS.span("parse"):
+        return parse_humble(resp.text)
 
-            title_elem = card.select_one(".entity-title")
-            title = title_elem.get_text(strip=True) if title_elem else ""
+def parse_humble(html: str):
+    """
+    -100% cards from one Humble store search page. Returns (items, has_more):
+    results are sorted by discount, so a page without cards ends the walk.
+    """
+    soup = make_soup(html, HUMBLE_CARDS)
+
+    cards = soup.select(".entity-block-container")
+    items = []
+    for card in cards:
+        discount_elem = card.select_one(".discount-amount")
+        discount_text = discount_elem.get_text(strip=True) if discount_elem else ""
+        if discount_text != "-100%":
+            continue
+
+        title_elem = card.select_one(".entity-title")
+        title = title_elem.get_text(strip=True) if title_elem else ""
+
+        img_elem = card.select_one("img")
+        banner = img_elem.get("src") if img_elem and img_elem.has_attr("src") else ""
+
+        a = card.select_one("a[href]")
+        href = (a.get("href") if a else "") or ""
+        if href and href.startswith("/"):
+            link = f"https://www.humblebundle.com{href}"
+        else:
+            link = href
 
-            img_elem = card.select_one("img")
-            banner = img_elem.get("src") if img_elem and img_elem.has_attr("src") else ""
+        expiry_elem = card.select_one(".promo-timer, .countdown")
+        expiry = expiry_elem.get_text(strip=True) if expiry_elem else None
 
-            a = card.select_one("a[href]")
-            href = (a.get("href") if a else "") or ""
-            if href and href.startswith("/"):
-                link = f"https://www.humblebundle.com{href}"
-            else:
-                link = href
-
-            expiry_elem = card.select_one(".promo-timer, .countdown")
-            expiry = expiry_elem.get_text(strip=True) if expiry_elem else None
-
-            status = "Fresh Drop"
-            if expiry:
-                status += f" (Expires {expiry})"
-
-            if title:
-                item = {
-                    "platform": "Humble",
-                    "title": title,
-                    "status": status,
-                    "banner": banner,
-                    "link": link
-                }
-                out.append(ensure_link_and_cta(item, "Claim directly on Humble"))
+        status = "Fresh Drop"
+        if expiry:
+            status += f" (Expires {expiry})"
+
+        if title:
+            item = {
+                "platform": "Humble",
+                "title": title,
+                "status": status,
+                "banner": banner,
+                "link": link
+            }
+            ends_at = parse_expiry(expiry)
+            if ends_at:
+                item["ends_at"] = ends_at
+            items.append(ensure_link_and_cta(item, "Claim directly on Humble"))
+    return items, bool(cards)
+
+def get_humble_free():
+    out = []
+    try:
+        out.extend(paginate(_humble_page))
     except Exception as e:
         print("Humble scrape error:", e)
+        raise
     return out
 
 def get_ubisoft():
@@ -360,123 +838,262 @@ def get_ubisoft():
     Finds Ubisoft free games by scraping the official Ubisoft News website
     for announcements, which is a more stable method than scraping the store.
     """
-    out = []
     print("[Ubisoft] Starting Ubisoft News fetch...")
     try:
         url = "https://news.ubisoft.com/en-us/"
-        html = requests.get(url, headers=HEADERS, timeout=20).text
-        soup = BeautifulSoup(html, "html.parser")
+        with METRICS.span("fetch"):
+            resp = HTTP.get(url, timeout=20)
+            resp.raise_for_status()
+        with METRICS.span("parse"):
+            out = parse_ubisoft(resp.text)
+    except Exception as e:
+        print(f"Ubisoft error: {e}")
+        raise
+
+    print(f"[Ubisoft] Found {len(out)} potential free game announcements.")
+    return out
+
+def parse_ubisoft(html: str):
+    """Giveaway announcements on the Ubisoft News front page, one per link."""
+    out = []
+    soup = make_soup(html, UBISOFT_ARTICLES)
 
-        keywords = ["free", "claim", "yours to keep", "giveaway"]
+    keywords = ["free", "claim", "yours to keep", "giveaway"]
 
-        articles = soup.select("article.news-list-article")
+    articles = soup.select("article.news-list-article")
 
-        for article in articles:
-            article_text = article.get_text().lower()
+    for article in articles:
+        article_text = article.get_text().lower()
+        
+        if any(keyword in article_text for keyword in keywords):
+            title_tag = article.select_one("div.news-title")
+            title = title_tag.get_text(strip=True) if title_tag else "Ubisoft Giveaway Announcement"
             
-            if any(keyword in article_text for keyword in keywords):
-                title_tag = article.select_one("div.news-title")
-                title = title_tag.get_text(strip=True) if title_tag else "Ubisoft Giveaway Announcement"
-                
-                link_tag = article.select_one("a.news-list-article-link")
-                link = link_tag.get("href", "") if link_tag else ""
-                
-                
-                item = {
-                    "platform": "Ubisoft",
-                    "title": title,
-                    "status": "Fresh Drop",
-                    "banner": "",
-                    "link": link
-                }
-                out.append(ensure_link_and_cta(item, "Read announcement on news.ubisoft.com"))
-    
-    except Exception as e:
-        print(f"Ubisoft error: {e}")
-    
-    unique_out = {item['link']: item for item in out}.values()
-    print(f"[Ubisoft] Found {len(unique_out)} potential free game announcements.")
-    return list(unique_out)
+            link_tag = article.select_one("a.news-list-article-link")
+            link = link_tag.get("href", "") if link_tag else ""
+            
+            
+            item = {
+                "platform": "Ubisoft",
+                "title": title,
+                "status": "Fresh Drop",
+                "banner": "",
+                "link": link
+            }
+            out.append(ensure_link_and_cta(item, "Read announcement on news.ubisoft.com"))
+
+    return list({item['link']: item for item in out}.values())
 
 # ---------- PRIME GAMING (Playwright) ----------
 
+PRIME_URL = "https://gaming.amazon.com/home"
+PRIME_CARD_SELECTOR = "div[data-a-target='item-card']"
+PRIME_PROFILE_DIR = os.getenv("PRIME_PROFILE_DIR", ".prime_profile")
+# Set PRIME_DEBUG_HTML=1 to dump the rendered page to prime_debug.html.
+PRIME_DEBUG_HTML = os.getenv("PRIME_DEBUG_HTML", "") == "1"
+
+PRIME_BLOCKED_TYPES = {"image", "media", "font"}
+PRIME_FIRST_PARTY = ("amazon.com", "media-amazon.com", "ssl-images-amazon.com")
+
+# Resolves once the number of cards has not changed for `quietMs`.
+PRIME_CARDS_SETTLED_JS = """
+([selector, quietMs]) => {
+    const n = document.querySelectorAll(selector).length;
+    if (window.__fgnCards !== n) {
+        window.__fgnCards = n;
+        window.__fgnSince = Date.now();
+        return false;
+    }
+    return n > 0 && Date.now() - window.__fgnSince >= quietMs;
+}
+"""
+
+class PrimeSession:
+    """
+    Keeps one persistent Firefox context alive for Prime Gaming fetches.
+    Playwright's sync objects belong to the thread that created them, so
+    every browser call runs on one dedicated worker thread; callers on any
+    thread just get the rendered HTML back.
+    Images, media, fonts and third-party requests are aborted in routing.
+    """
+
+    def __init__(self, profile_dir=PRIME_PROFILE_DIR):
+        self.profile_dir = profile_dir
+        self._executor = None
+        self._pw = None
+        self._context = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _route(route):
+        req = route.request
+        host = req.url.split("/")[2].split(":")[0] if "://" in req.url else ""
+        first_party = any(host == d or host.endswith("." + d) for d in PRIME_FIRST_PARTY)
+        if req.resource_type in PRIME_BLOCKED_TYPES or not first_party:
+            route.abort()
+        else:
+            route.continue_()
+
+    def _ensure_context(self):
+        if self._context is None:
+            from playwright.sync_api import sync_playwright
+            self._pw = sync_playwright().start()
+            self._context = self._pw.firefox.launch_persistent_context(self.profile_dir, headless=True)
+            self._context.route("**/*", self._route)
+        return self._context
+
+    def _fetch(self, url):
+        page = self._ensure_context().new_page()
+        try:
+            page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            page.wait_for_selector(PRIME_CARD_SELECTOR, timeout=30000)
+            try:
+                page.wait_for_function(
+                    PRIME_CARDS_SETTLED_JS, arg=[PRIME_CARD_SELECTOR, 500], polling=100, timeout=10000
+                )
+            except Exception:
+                print("[PRIME] Card count still changing after 10s; using what is rendered.")
+            return page.content()
+        finally:
+            page.close()
+
+    def _shutdown_browser(self):
+        try:
+            if self._context is not None:
+                self._context.close()
+            if self._pw is not None:
+                self._pw.stop()
+        finally:
+            self._context = None
+            self._pw = None
+
+    def fetch_html(self, url=PRIME_URL) -> str:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prime-browser")
+            executor = self._executor
+        return executor.submit(self._fetch, url).result()
+
+    def close(self, timeout: float = 15):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        try:
+            executor.submit(self._shutdown_browser).result(timeout=timeout)
+        except Exception as e:
+            print("[PRIME] Browser shutdown error:", e)
+        executor.shutdown(wait=False)
+
+PRIME = PrimeSession()
+
 def get_prime_free():
     """
     Playwright HTML scraper for Prime Gaming.
-    FINAL version with a reliable "smart wait" and all custom logic.
+    Renders the page in the shared PrimeSession and waits until the card
+    count settles instead of sleeping a fixed time.
     """
-    results = []
-    skipped_entries = []
     html = ""
+    browser_error = None
 
-    try:
-        with sync_playwright() as p:
-            browser = p.firefox.launch(headless=True)
-            page = browser.new_page()
-            page.goto("https://gaming.amazon.com/home", timeout=60000, wait_until="domcontentloaded")
-            page.wait_for_selector("div[data-a-target='item-card']", timeout=30000)
-            page.wait_for_timeout(2000)
-
-            html = page.content()
-            with open("prime_debug.html", "w", encoding="utf-8") as f:
-                f.write(html)
-            browser.close()
-            
-    except Exception as e:
-        print("Playwright Prime error:", e)
+    # Replays serve the recorded rendered page through the plain HTTP fallback.
+    if HTTP.transport != "replay":
+        try:
+            with METRICS.span("fetch"):
+                html = PRIME.fetch_html(PRIME_URL)
+            METRICS.count("browser_bytes", len(html.encode("utf-8")))
+            if PRIME_DEBUG_HTML:
+                with open("prime_debug.html", "w", encoding="utf-8") as f:
+                    f.write(html)
+            if HTTP.transport == "record":
+                replay.save_fixture(replay.configured()[0], "GET", PRIME_URL, 200,
+                                    {"Content-Type": "text/html; charset=utf-8"}, html.encode("utf-8"))
+        except Exception as e:
+            print("Playwright Prime error:", e)
+            browser_error = e
 
     if not html:
         try:
-            html = requests.get("https://gaming.amazon.com/home", headers=HEADERS, timeout=20).text
+            with METRICS.span("fetch_fallback"):
+                resp = HTTP.get(PRIME_URL, timeout=20, use_cache=False)
+                resp.raise_for_status()
+            html = resp.text
         except Exception as e:
             print("Prime fallback fetch error:", e)
-            html = ""
-
-    if html:
-        soup = BeautifulSoup(html, "html.parser")
-        cards = soup.select("div[data-a-target='item-card']")
-        for card in cards:
-            title_tag = card.select_one("h3")
-            if not title_tag:
-                continue
-            title = title_tag.get_text(strip=True)
-            
-            banner = ""
-            img_tag = card.select_one("img.item-card-image__image")
-            if img_tag and img_tag.has_attr("src"):
-                banner = img_tag["src"]
-
-            footer_text = card.select_one(".item-card-details__footer")
-            status = "Fresh Drop"
-            expired_flag = False
-            if footer_text:
-                txt = footer_text.get_text(" ", strip=True)
-                if "Ends" in txt:
-                    status = txt
-                if "Ended" in txt or "expired" in txt.lower():
-                    expired_flag = True
-
-            if expired_flag:
-                continue
+            raise
 
-            claim_link_tag = card.select_one("a[data-a-target='FGWPOffer'], a[data-a-target='learn-more-card']")
-            link = ""
-            if claim_link_tag and claim_link_tag.get("href"):
-                link = "https://gaming.amazon.com" + claim_link_tag["href"]
+    with METRICS.span("parse"):
+        results, skipped_entries = parse_prime(html)
 
-            entry = {
-                "platform": "Prime Gaming",
-                "title": title,
-                "link": link,
-                "status": status,
-                "banner": banner
-            }
+    # The plain page is a JS shell with no cards. Counting that as a good
+    # result would expire every Prime drop; failing serves last-known-good.
+    if browser_error is not None and not results and not skipped_entries:
+        raise RuntimeError(f"Prime browser failed and the HTTP fallback had no cards: {browser_error}")
 
-            if link:
-                results.append(entry)
-            else:
-                entry = ensure_link_and_cta(entry, "Claim on Prime Gaming")
-                skipped_entries.append(entry)
+    save_json(PRIME_WITH_LINK, results)
+    save_json(PRIME_SKIPPED, skipped_entries)
+
+    print(
+        f"Prime Gaming (HTML) active total={len(results)+len(skipped_entries)} "
+        f"(with links={len(results)}, skipped={len(skipped_entries)})"
+    )
+    return results, skipped_entries
+
+def parse_prime(html: str):
+    """
+    Active offers from a rendered Prime Gaming page, as (with_link, skipped):
+    cards without a claim link still count but get the default CTA.
+    """
+    results = []
+    skipped_entries = []
+    soup = make_soup(html, PRIME_CARDS)
+    cards = soup.select("div[data-a-target='item-card']")
+    for card in cards:
+        title_tag = card.select_one("h3")
+        if not title_tag:
+            continue
+        title = title_tag.get_text(strip=True)
+        
+        banner = ""
+        img_tag = card.select_one("img.item-card-image__image")
+        if img_tag and img_tag.has_attr("src"):
+            banner = img_tag["src"]
+
+        footer_text = card.select_one(".item-card-details__footer")
+        status = "Fresh Drop"
+        expired_flag = False
+        if footer_text:
+            txt = footer_text.get_text(" ", strip=True)
+            if "Ends" in txt:
+                status = txt
+            if "Ended" in txt or "expired" in txt.lower():
+                expired_flag = True
+
+        if expired_flag:
+            continue
+
+        claim_link_tag = card.select_one("a[data-a-target='FGWPOffer'], a[data-a-target='learn-more-card']")
+        link = ""
+        if claim_link_tag and claim_link_tag.get("href"):
+            link = "https://gaming.amazon.com" + claim_link_tag["href"]
+
+        entry = {
+            "platform": "Prime Gaming",
+            "title": title,
+            "link": link,
+            "status": status,
+            "banner": banner
+        }
+        if status.startswith("Ends"):
+            ends_at = parse_expiry(status)
+            if ends_at:
+                entry["ends_at"] = ends_at
+
+        if link:
+            results.append(entry)
+        else:
+            entry = ensure_link_and_cta(entry, "Claim on Prime Gaming")
+            skipped_entries.append(entry)
 
     def dedupe(data):
         unique = {}
@@ -486,151 +1103,356 @@ def get_prime_free():
                 unique[key] = r
         return list(unique.values())
 
-    results = dedupe(results)
-    skipped_entries = dedupe(skipped_entries)
+    return dedupe(results), dedupe(skipped_entries)
 
-    save_json(PRIME_WITH_LINK, results)
-    save_json(PRIME_SKIPPED, skipped_entries)
+# ------------------ RUNNER ------------------
 
-    print(
-        f"Prime Gaming (HTML) active total={len(results)+len(skipped_entries)} "
-        f"(with links={len(results)}, skipped={len(skipped_entries)})"
-    )
-    return results, skipped_entries
+# fetch: scraper; deadline: seconds a run waits for it; platform: the group
+# it fills in game_data.json; ttl: seconds a fetched result stays fresh.
+Source = namedtuple("Source", "fetch deadline platform ttl")
 
-# ------------------ MAIN ------------------
+SOURCES = {
+    "egs": Source(get_egs_free, 30, "Epic Games Store", 6 * 3600),
+    "gog": Source(get_gog_free, 30, "GOG", 3600),
+    "steam": Source(get_steam_free, 30, "Steam", 3600),
+    "humble": Source(get_humble_free, 30, "Humble", 1800),
+    "ubisoft": Source(get_ubisoft, 30, "Ubisoft", 6 * 3600),
+    "prime": Source(get_prime_free, 110, "Prime Gaming", 1800),
+}
+# Per-source TTL overrides, e.g. SOURCE_TTLS="humble=900,egs=43200".
+for _pair in filter(None, os.getenv("SOURCE_TTLS", "").split(",")):
+    _name, _, _secs = _pair.partition("=")
+    if _name.strip() in SOURCES and _secs.strip():
+        SOURCES[_name.strip()] = SOURCES[_name.strip()]._replace(ttl=float(_secs))
 
-def main():
-    def is_expired(status: str) -> bool:
-        s = (status or "").strip().lower()
-        return any(k in s for k in ["expired", "ended", "no longer", "unavailable"])
+def due_sources(sources: dict, health: SourceHealth, snapshot: dict, now: float = None):
+    """
+    Names of the sources worth fetching now: never fetched, past their TTL,
+    or holding a snapshot item whose start or expiry time has passed since
+    the last fetch (so an EGS rotation is picked up on time).
+    """
+    now = now or time.time()
+    due = []
+    for name, src in sources.items():
+        fetched = health.last_fetched(name)
+        if now - fetched >= src.ttl:
+            due.append(name)
+            continue
+        for it in snapshot.get(src.platform, []):
+            flips = (parse_time(it.get("starts_at")), parse_time(it.get("ends_at")))
+            if any(t and fetched < t.timestamp() <= now for t in flips):
+                due.append(name)
+                break
+    return due
+
+def source_due_times(sources: dict, health: SourceHealth) -> dict:
+    """name -> UTC datetime at which each source's TTL runs out."""
+    return {
+        name: datetime.fromtimestamp(health.last_fetched(name) + src.ttl, timezone.utc)
+        for name, src in sources.items()
+    }
 
-    def dedupe_by_title(items):
-        seen = {}
-        for it in items or []:
-            title = (it.get("title") or "").strip().lower()
-            if title and title not in seen:
-                seen[title] = it
-        return list(seen.values())
+# Fields publish() adds to snapshot rows; a scraper never returns them.
+SNAPSHOT_DERIVED = ("claim_links", "thumb", "thumb_srcset")
 
+def unpublish(it: dict) -> dict:
+    """A game_data.json row as its scraper returned it, as near as can be told."""
+    return {k: v for k, v in it.items() if k not in SNAPSHOT_DERIVED}
 
-    old_grouped = load_json(DATA_FILE, {})
+def snapshot_results(snapshot: dict, names, health: SourceHealth = None) -> dict:
+    """
+    Stand-in scraper results for sources not fetched this run. The raw
+    result kept in source_cache.json is used when there is one: game_data.json
+    holds drops after cross-platform folding, so a listing folded into
+    another source's drop is missing from its own platform there. Without a
+    cached result the snapshot rows are used, minus the fields publish()
+    derived from them.
+    """
+    results = {}
+    for name in names:
+        raw = health.last_good(name) if health is not None else None
+        if raw is not None:
+            if name == "prime":
+                results[name] = tuple([dict(it) for it in part] for part in raw)
+            else:
+                results[name] = [dict(it) for it in raw]
+            continue
+        items = [unpublish(it) for it in snapshot.get(SOURCES[name].platform, [])]
+        # get_prime_free returns (with_link, skipped); the snapshot already holds both.
+        results[name] = (items, []) if name == "prime" else items
+    return results
+
+def count_items(result) -> int:
+    """Items in a scraper result; Prime's is a (with_link, skipped) pair."""
+    if result and isinstance(result[0], (list, tuple)):
+        return sum(len(part) for part in result)
+    return len(result or [])
+
+def run_sources(sources: dict, budget: float = RUN_BUDGET, health: SourceHealth = None):
+    """
+    Starts every source at once on its own daemon thread and waits for each
+    one until its own deadline or the global run budget, whichever is first.
+    A source that is still running after that is abandoned, so one slow site
+    can no longer hold up the whole run.
+
+    Every HTTP request a source makes, from its own pools too, runs under
+    that same deadline (http_client.call_deadline), so its retries stop
+    there as well. What still hangs past it (the Prime browser) is left
+    behind: see exit_now().
+
+    Scrapers raise on failure. With `health` given, a failed or abandoned
+    source is served from its last-known-good result, and a source whose
+    breaker is open is not started at all.
+    """
+    results = {}
+    errors = {}
+    started = time.monotonic()
+    run_deadline = started + budget
+
+    def worker(name, fn, deadline):
+        t0 = time.monotonic()
+        with METRICS.source(name), METRICS.span("scrape"), call_deadline(deadline):
+            try:
+                results[name] = fn()
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+                METRICS.count("errors")
+                print(f"[RUNNER] {name} failed: {e}")
+        print(f"[RUNNER] {name} finished in {time.monotonic() - t0:.1f}s")
+
+    threads = {}
+    for name, src in sources.items():
+        if health is not None and not health.should_fetch(name):
+            print(f"[RUNNER] {name} breaker is open; not fetching it this run.")
+            health.record_skipped(name)
+            continue
+        deadline = min(started + src.deadline, run_deadline)
+        t = threading.Thread(target=worker, args=(name, src.fetch, deadline), name=f"source-{name}", daemon=True)
+        t.start()
+        threads[name] = (t, deadline)
+
+    collected = {}
+    for name, (t, deadline) in threads.items():
+        t.join(max(0.0, min(deadline, run_deadline) - time.monotonic()))
+        if t.is_alive():
+            print(f"[RUNNER] {name} missed its deadline; skipping it this run.")
+            errors[name] = "missed deadline"
+        elif name in results:
+            collected[name] = results[name]
+            METRICS.count("items", count_items(results[name]), source=name)
+            if health is not None:
+                health.record_success(name, results[name])
+            continue
+        if health is not None:
+            health.record_failure(name, errors.get(name, "unknown error"))
+
+    if health is not None:
+        for name in sources:
+            if name in collected:
+                continue
+            cached = health.cached(name)
+            if cached is not None:
+                print(f"[RUNNER] {name}: serving last-known-good result.")
+                collected[name] = cached
+                METRICS.count("served_from_cache", 1, source=name)
 
-    egs = get_egs_free()
-    gog = get_gog_free()
-    steam = get_steam_free()
-    humble = get_humble_free()
-    ubi = get_ubisoft()
-    prime_with_link_return, prime_skipped_return = get_prime_free()
-
-    print(f"[SCRAPER] Epic Games: {len(egs)}")
-    print(f"[SCRAPER] GOG: {len(gog)}")
-    print(f"[SCRAPER] Steam: {len(steam)}")
-    print(f"[SCRAPER] Humble: {len(humble)}")
-    print(f"[SCRAPER] Ubisoft: {len(ubi)}")
-    print(f"[SCRAPER] Prime (returned) with link: {len(prime_with_link_return)}")
-    print(f"[SCRAPER] Prime (returned) skipped : {len(prime_skipped_return)}")
+    print(f"[RUNNER] All sources done in {time.monotonic() - started:.1f}s")
+    return collected
 
-    grouped = {}
-    expired_filtered = 0
+# ------------------ MAIN ------------------
 
-    def add_items(items):
-        nonlocal expired_filtered
-        for it in items or []:
-            if is_expired(it.get("status", "")):
-                expired_filtered += 1
-                continue
-            src = it.get("platform") or "Other"
-            grouped.setdefault(src, []).append(it)
+def is_expired(status: str) -> bool:
+    s = (status or "").strip().lower()
+    return any(k in s for k in ["expired", "ended", "no longer", "unavailable"])
+
+# Pipeline stages. Each takes and yields items one at a time, so a source
+# returning tens of thousands of rows never has a second full copy made.
+
+def source_stream(results: dict):
+    """Raw scraper rows, source by source in SOURCES order."""
+    for name in SOURCES:
+        result = results.get(name)
+        if not result:
+            continue
+        if name == "prime":
+            # (with_link, skipped); both count as active Prime drops.
+            for part in result:
+                yield from part
+        else:
+            yield from result
+
+def normalize(rows):
+    for row in rows:
+        yield ensure_link_and_cta(Item.from_dict(row))
+
+def drop_expired(items, stats: dict):
+    for it in items:
+        if is_expired(it.status):
+            stats["expired"] += 1
+            continue
+        yield it
+
+def dedupe(items, stats: dict):
+    """Drops repeats of the same listing (same platform and link, or title when there is no link)."""
+    seen = set()
+    for it in items:
+        link = canonical_link(it.link)
+        key = (it.platform, link) if link else (it.platform, "title:" + it.title.strip().lower())
+        if key in seen:
+            stats["duplicates"] += 1
+            continue
+        seen.add(key)
+        yield it
+
+def group(items) -> dict:
+    grouped = {}
+    for it in items:
+        grouped.setdefault(it.platform or "Other", []).append(it)
+    return grouped
 
-    add_items(egs)
-    add_items(gog)
-    add_items(steam)
-    add_items(humble)
-    add_items(ubi)
+def build_grouped(results: dict) -> dict:
+    """
+    Groups the per-source scraper results by platform, dropping expired
+    entries and repeats, and folding one game listed on several platforms
+    into a single drop with claim links.
+    """
+    for name in SOURCES:
+        print(f"[SCRAPER] {name}: {count_items(results.get(name))}")
 
-    try:
-        prime_with_link_file = load_json(PRIME_WITH_LINK, [])
-    except Exception as e:
-        print("[WARN] Failed to load PRIME_WITH_LINK file; using returned list. Err:", e)
-        prime_with_link_file = prime_with_link_return
+    stats = {"expired": 0, "duplicates": 0, "cross_platform": 0}
+    items = dedupe(drop_expired(normalize(source_stream(results)), stats), stats)
+    grouped = group(link_duplicates(items, stats, PLATFORM_ORDER))
 
-    try:
-        prime_skipped_file = load_json(PRIME_SKIPPED, [])
-    except Exception as e:
-        print("[WARN] Failed to load PRIME_SKIPPED file; using returned list. Err:", e)
-        prime_skipped_file = prime_skipped_return
-
-    save_json(PRIME_SKIPPED, prime_skipped_file or [])
-
-    prime_with_link_file = dedupe_by_title(prime_with_link_file)
-    prime_skipped_file = dedupe_by_title(prime_skipped_file)
-
-    def titles(items): return sorted((it.get("title") or "").strip() for it in items)
-
-    ret_w, ret_s = set(titles(prime_with_link_return)), set(titles(prime_skipped_return))
-    fil_w, fil_s = set(titles(prime_with_link_file)), set(titles(prime_skipped_file))
-
-    if ret_w != fil_w or ret_s != fil_s:
-        print("[DEBUG] PRIME mismatch between returned and file sets detected.")
-        only_in_return_with = sorted(ret_w - fil_w)
-        only_in_file_with = sorted(fil_w - ret_w)
-        only_in_return_skip = sorted(ret_s - fil_s)
-        only_in_file_skip = sorted(fil_s - ret_s)
-        if only_in_return_with:
-            print("  ↪ Only in RETURN (with-link):", only_in_return_with)
-        if only_in_file_with:
-            print("  ↪ Only in FILE   (with-link):", only_in_file_with)
-        if only_in_return_skip:
-            print("  ↪ Only in RETURN (skipped)  :", only_in_return_skip)
-        if only_in_file_skip:
-            print("  ↪ Only in FILE   (skipped)  :", only_in_file_skip)
-
-    prime_union_file = prime_with_link_file + prime_skipped_file
-    prime_union_file_active = [it for it in prime_union_file if not is_expired(it.get("status", ""))]
-    add_items(prime_union_file_active)
-
-    print(f"[FILTER] Expired entries removed: {expired_filtered}")
+    print(f"[FILTER] Expired entries removed: {stats['expired']}, duplicates: {stats['duplicates']}, "
+          f"linked across platforms: {stats['cross_platform']}")
     print(f"[RESULT] Platforms in grouped: {list(grouped.keys())}")
+    source_of = {s.platform: name for name, s in SOURCES.items()}
     for src, items in grouped.items():
         print(f"[RESULT] {src}: {len(items)} items")
+        METRICS.count("items_kept", len(items), source=source_of.get(src, src))
+    return grouped
 
-    prime_in_grouped = [it for it in grouped.get("Prime Gaming", [])]
-    expected_prime_count = len(prime_union_file_active)
-    if len(prime_in_grouped) != expected_prime_count:
-        print(
-            f"[ERROR] Prime count mismatch in grouped! grouped={len(prime_in_grouped)} "
-            f"expected={expected_prime_count}"
-        )
-        grp_titles = set(titles(prime_in_grouped))
-        exp_titles = set(titles(prime_union_file_active))
-        print("  ↪ Only in grouped:", sorted(grp_titles - exp_titles))
-        print("  ↪ Only in expected:", sorted(exp_titles - grp_titles))
+def publish(old_grouped: dict, grouped: dict, source_due: dict = None):
+    """
+    Everything after scraping: thumbnails, data files, history, dashboard,
+    notifications and the next-run plan. Files are only rewritten when
+    their content changed. Returns the change lines.
+    """
+    carry_over_expiry(old_grouped, grouped)
+    with METRICS.span("images"):
+        ImageCache(HTTP).process(grouped)
 
     flat = []
     for v in grouped.values():
         flat.extend(v)
 
-    save_json(DROPS_FILE, flat)
-    save_json(DATA_FILE, grouped)
+    with METRICS.span("write"):
+        drops_changed, drops_version = publish_json(DROPS_FILE, flat)
+        for region in REGIONS:
+            publish_json(DROPS_REGION_FILE.format(region=region), region_view(flat, region))
+        save_json(DROPS_VERSION_FILE, {"version": drops_version}, compact=True)
+        save_json(DATA_FILE, grouped)
 
 
 # ------------------ FINAL CHANGES AND TELEGRAM NOTIFICATIONS ------------------
 
-    changes = compare_and_build(old_grouped, grouped)
-    build_dashboard(grouped)
+    with METRICS.span("diff"):
+        changes, change_events = compare_and_build(old_grouped, grouped)
+    METRICS.count("changes", len(changes))
+    with METRICS.span("write"):
+        publish_feeds(change_events, drops_version)
+        if drops_changed or change_events:
+            # One more version for the read API's /changes cursor.
+            log = load_json(CHANGE_LOG_FILE, {})
+            log = append_change_set(log, change_events, iso_utc(datetime.now(timezone.utc)))
+            save_json(CHANGE_LOG_FILE, log, compact=True)
+    # The dashboard's timestamp means "data last changed", so an unchanged
+    # run leaves it (and the repo) untouched.
+    if drops_changed or not os.path.exists(DASHBOARD_FILE):
+        with METRICS.span("write"):
+            build_dashboard(grouped, drops_version)
 
     if changes:
-        msg = (
-            "🗞 <b>Free Game Update</b> 🗞\n\n"
-            + "\n".join(changes)
-            + f"\n\n🌐 <a href=\"{DASHBOARD_LINK}\">Dashboard</a>"
-        )
-        with open(SUMMARY_FILE, "w", encoding="utf-8") as f:
-            f.write(msg)
-        send_telegram(msg)
+        msg = format_update(changes)
+        with METRICS.span("write"):
+            with open(SUMMARY_FILE, "w", encoding="utf-8") as f:
+                f.write(msg)
+            save_json(CHANGES_FILE, change_events)
+        with METRICS.span("notify"):
+            send_telegram(msg)
     else:
         print("[INFO] No changes at", now_str())
 
+    save_next_plan(grouped, source_due)
+    return changes
+
+def save_next_plan(grouped: dict, source_due: dict = None):
+    plan = plan_next_run(grouped, source_due=source_due)
+    save_plan(plan)
+    print(f"[SCHEDULE] Next run at {plan['next_run']}: {plan['reason']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Free game notifier.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="stay resident and poll every source on its own interval")
+    parser.add_argument("--sources", metavar="NAMES",
+                        help=f"comma-separated sources to fetch ({','.join(SOURCES)}); "
+                             "the rest are taken from the last snapshot")
+    parser.add_argument("--due-only", action="store_true",
+                        help="fetch only the selected sources whose TTL has run out")
+    args = parser.parse_args(argv)
+
+    selected = list(SOURCES)
+    if args.sources:
+        selected = [n.strip() for n in args.sources.split(",") if n.strip()]
+        unknown = [n for n in selected if n not in SOURCES]
+        if unknown:
+            parser.error(f"unknown source(s): {', '.join(unknown)}")
+
+    if args.daemon:
+        from daemon import run_daemon
+        run_daemon(sys.modules[__name__], {n: SOURCES[n] for n in selected})
+        return
+
+    METRICS.reset()
+    old_grouped = load_json(DATA_FILE, {})
+    health = SourceHealth()
+
+    if args.due_only:
+        due = due_sources(SOURCES, health, old_grouped)
+        selected = [n for n in selected if n in due]
+    if not selected:
+        print("[RUNNER] No sources due; nothing to fetch.")
+        save_next_plan(old_grouped, source_due_times(SOURCES, health))
+        METRICS.write_reports()
+        return
+    print(f"[RUNNER] Fetching: {', '.join(selected)}")
+
+    results = run_sources({n: SOURCES[n] for n in selected}, health=health)
+    PRIME.close()
+    health.save()
+    results.update(snapshot_results(old_grouped, [n for n in SOURCES if n not in selected], health))
+
+    with METRICS.span("filter"):
+        grouped = build_grouped(results)
+    publish(old_grouped, grouped, source_due_times(SOURCES, health))
+
+    health.report()
+    METRICS.write_reports()
+
+def exit_now():
+    """
+    Ends a one-shot run once everything is written. The interpreter joins
+    every executor thread at exit, so a source abandoned while its pool was
+    still busy (a hung Prime browser) would otherwise keep the process
+    alive long after the run is done.
+    """
+    if any(t.name.startswith("source-") and t.is_alive() for t in threading.enumerate()):
+        print("[RUNNER] Abandoned sources still running; exiting without waiting for them.")
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(0)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    exit_now()
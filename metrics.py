@@ -0,0 +1,196 @@
+import os
+import json
+import time
+import threading
+import statistics
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from datetime import datetime, timezone
+
+from fileio import write_atomic
+
+# End-of-run outputs: a JSON report, a Prometheus textfile (for the
+# node_exporter textfile collector) and a rolling one-line-per-run history.
+METRICS_REPORT = os.getenv("METRICS_REPORT", "run_metrics.json")
+METRICS_PROM = os.getenv("METRICS_PROM", "run_metrics.prom")
+METRICS_HISTORY = os.getenv("METRICS_HISTORY", "run_metrics_history.jsonl")
+METRICS_HISTORY_KEEP = int(os.getenv("METRICS_HISTORY_KEEP", "500"))
+# A stage is flagged when it takes this many times its median over recent runs.
+REGRESSION_FACTOR = 1.5
+REGRESSION_WINDOW = 20
+REGRESSION_MIN_SECONDS = 0.5
+
+_current_source = ContextVar("metrics_source", default="all")
+
+
+class Metrics:
+    """
+    Per-run timing spans and counters, attributed to a source.
+
+    The source is carried in a context variable: run_sources() sets it on
+    each scraper thread, carry_source() hands it to pool workers, and
+    anything outside a source is attributed to "all". Spans of the same
+    (source, stage) are aggregated, so a paged fetch reports its total,
+    call count and slowest call.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.t0 = time.perf_counter()
+            self.spans = {}
+            self.counters = {}
+
+    # ---------- attribution ----------
+
+    @contextmanager
+    def source(self, name):
+        token = _current_source.set(name)
+        try:
+            yield
+        finally:
+            _current_source.reset(token)
+
+    @staticmethod
+    def carry_source(fn):
+        """
+        Wraps fn so it runs under the caller's source when handed to a thread
+        pool. The whole context is carried, so other context variables (such
+        as the HTTP call deadline) reach the pool's threads as well.
+        """
+        ctx = copy_context()
+
+        def run(*args, **kwargs):
+            # A context is entered by one thread at a time; each call gets a copy.
+            return ctx.copy().run(fn, *args, **kwargs)
+        return run
+
+    # ---------- recording ----------
+
+    @contextmanager
+    def span(self, stage, source=None):
+        source = source or _current_source.get()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self.lock:
+                s = self.spans.setdefault((source, stage), {"seconds": 0.0, "calls": 0, "max": 0.0})
+                s["seconds"] += elapsed
+                s["calls"] += 1
+                s["max"] = max(s["max"], elapsed)
+
+    def count(self, name, value=1, source=None):
+        key = (source or _current_source.get(), name)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    # ---------- reporting ----------
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            spans, counters = {}, {}
+            for (src, stage), s in self.spans.items():
+                spans.setdefault(src, {})[stage] = {
+                    "seconds": round(s["seconds"], 4), "calls": s["calls"], "max": round(s["max"], 4),
+                }
+            for (src, name), v in self.counters.items():
+                counters.setdefault(src, {})[name] = v
+            return {
+                "started_at": datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec="seconds"),
+                "duration": round(time.perf_counter() - self.t0, 3),
+                "spans": spans,
+                "counters": counters,
+            }
+
+    @staticmethod
+    def prometheus(report: dict) -> str:
+        lines = [
+            "# HELP notifier_run_duration_seconds Wall time of the last run.",
+            "# TYPE notifier_run_duration_seconds gauge",
+            f"notifier_run_duration_seconds {report['duration']}",
+            "# TYPE notifier_run_timestamp_seconds gauge",
+            f"notifier_run_timestamp_seconds {int(datetime.fromisoformat(report['started_at']).timestamp())}",
+            "# HELP notifier_stage_seconds Time spent per source and stage in the last run.",
+            "# TYPE notifier_stage_seconds gauge",
+        ]
+        for src, stages in sorted(report["spans"].items()):
+            for stage, s in sorted(stages.items()):
+                lines.append(f'notifier_stage_seconds{{source="{src}",stage="{stage}"}} {s["seconds"]}')
+        lines.append("# TYPE notifier_stage_calls gauge")
+        for src, stages in sorted(report["spans"].items()):
+            for stage, s in sorted(stages.items()):
+                lines.append(f'notifier_stage_calls{{source="{src}",stage="{stage}"}} {s["calls"]}')
+        names = sorted({n for c in report["counters"].values() for n in c})
+        for name in names:
+            lines.append(f"# TYPE notifier_{name} gauge")
+            for src, c in sorted(report["counters"].items()):
+                if name in c:
+                    lines.append(f'notifier_{name}{{source="{src}"}} {c[name]}')
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def history_line(report: dict) -> dict:
+        return {
+            "at": report["started_at"],
+            "duration": report["duration"],
+            "stages": {f"{src}.{stage}": s["seconds"]
+                       for src, stages in report["spans"].items() for stage, s in stages.items()},
+            "counters": {f"{src}.{name}": v
+                         for src, c in report["counters"].items() for name, v in c.items()},
+        }
+
+    def _load_history(self, path):
+        history = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        history.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return history
+
+    @staticmethod
+    def regressions(line: dict, history: list):
+        """(stage, seconds, median) for stages well above their recent median."""
+        recent = history[-REGRESSION_WINDOW:]
+        flagged = []
+        for stage, seconds in sorted(line["stages"].items()):
+            past = [h["stages"][stage] for h in recent if stage in h.get("stages", {})]
+            if len(past) < 3 or seconds < REGRESSION_MIN_SECONDS:
+                continue
+            median = statistics.median(past)
+            if seconds > median * REGRESSION_FACTOR:
+                flagged.append((stage, seconds, median))
+        return flagged
+
+    def write_reports(self, report_path=METRICS_REPORT, prom_path=METRICS_PROM,
+                      history_path=METRICS_HISTORY, keep=METRICS_HISTORY_KEEP):
+        report = self.snapshot()
+        write_atomic(report_path, json.dumps(report, indent=2, sort_keys=True))
+        write_atomic(prom_path, self.prometheus(report))
+
+        history = self._load_history(history_path)
+        line = self.history_line(report)
+        flagged = self.regressions(line, history)
+        history = (history + [line])[-keep:]
+        write_atomic(history_path, "".join(json.dumps(h, sort_keys=True) + "\n" for h in history))
+
+        stages = sorted(line["stages"].items(), key=lambda kv: -kv[1])[:6]
+        print(f"[METRICS] Run took {report['duration']:.1f}s; slowest: "
+              + ", ".join(f"{k}={v:.2f}s" for k, v in stages))
+        for stage, seconds, median in flagged:
+            print(f"[METRICS] Regression: {stage} took {seconds:.2f}s "
+                  f"(median {median:.2f}s over the last {min(len(history) - 1, REGRESSION_WINDOW)} runs)")
+        return report
+
+
+METRICS = Metrics()
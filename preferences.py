@@ -0,0 +1,122 @@
+from identity import normalize_title
+
+# Short names subscribers may use for a platform.
+PLATFORM_ALIASES = {
+    "epic": "epic games store",
+    "egs": "epic games store",
+    "prime": "prime gaming",
+    "amazon": "prime gaming",
+    "humble bundle": "humble",
+}
+
+DIGEST_HEADER = "🗞 <b>Free Game Update</b> 🗞\n\n"
+
+
+def normalize_platform(name: str) -> str:
+    p = (name or "").strip().lower()
+    return PLATFORM_ALIASES.get(p, p)
+
+
+def load_preferences(raw):
+    """
+    Subscriber records from subscribers.json.
+    Plain addresses in "emails" get everything; entries in "subscribers"
+    may narrow that with "platforms", "keywords" and "exclude" lists.
+    """
+    records = {}
+    for email in raw.get("emails", []) if isinstance(raw, dict) else raw:
+        email = (email or "").strip()
+        if email:
+            records.setdefault(email.lower(), {"email": email})
+    for rec in raw.get("subscribers", []) if isinstance(raw, dict) else []:
+        email = (rec.get("email") or "").strip()
+        if email:
+            records[email.lower()] = dict(rec, email=email)
+    return list(records.values())
+
+
+class PreferenceIndex:
+    """
+    Inverted indexes from platform / keyword token / exclusion token to
+    subscriber ids, so one run's change set is matched against every
+    subscriber in a single pass over the events: each event costs a few
+    set unions and one intersection, independent of how many subscribers
+    have no interest in it.
+    """
+
+    def __init__(self, subscribers):
+        self.emails = []
+        self.any_platform = set()
+        self.by_platform = {}
+        self.no_keywords = set()
+        self.by_keyword = {}     # first token -> [(sub id, " phrase ")]
+        self.by_exclude = {}     # first token -> [(sub id, " phrase ")]
+        for sid, rec in enumerate(subscribers):
+            self.emails.append(rec["email"])
+            platforms = [normalize_platform(p) for p in rec.get("platforms") or [] if p]
+            if platforms:
+                for p in platforms:
+                    self.by_platform.setdefault(p, set()).add(sid)
+            else:
+                self.any_platform.add(sid)
+            keywords = [normalize_title(k) for k in rec.get("keywords") or []]
+            keywords = [k for k in keywords if k]
+            if keywords:
+                self._index_phrases(self.by_keyword, sid, keywords)
+            else:
+                self.no_keywords.add(sid)
+            excludes = [normalize_title(k) for k in rec.get("exclude") or []]
+            self._index_phrases(self.by_exclude, sid, [k for k in excludes if k])
+
+    @staticmethod
+    def _index_phrases(index, sid, phrases):
+        for phrase in phrases:
+            index.setdefault(phrase.split()[0], []).append((sid, f" {phrase} "))
+
+    @staticmethod
+    def _phrase_hits(index, tokens, padded):
+        hits = set()
+        for tok in tokens:
+            for sid, phrase in index.get(tok, ()):
+                if phrase in padded:
+                    hits.add(sid)
+        return hits
+
+    def match(self, events):
+        """Returns {subscriber id: [event, ...]} for subscribers with at least one match."""
+        digests = {}
+        for ev in events:
+            norm = normalize_title(ev.get("title"))
+            tokens = set(norm.split())
+            padded = f" {norm} "
+            platform_ok = set(self.any_platform)
+            for p in ev.get("platforms") or [ev.get("platform")]:
+                platform_ok |= self.by_platform.get(normalize_platform(p), set())
+            if not platform_ok:
+                continue
+            keyword_ok = self.no_keywords | self._phrase_hits(self.by_keyword, tokens, padded)
+            matched = platform_ok & keyword_ok
+            if matched:
+                matched -= self._phrase_hits(self.by_exclude, tokens, padded)
+            for sid in matched:
+                digests.setdefault(sid, []).append(ev)
+        return digests
+
+
+def render_digest(events) -> str:
+    return DIGEST_HEADER + "\n".join(ev["line"] for ev in events)
+
+
+def personalized_digests(subscribers, events):
+    """
+    Groups recipients that receive the same digest: returns a list of
+    (digest_text, [emails]). Subscribers matching nothing get no message.
+    """
+    index = PreferenceIndex(subscribers)
+    groups = {}
+    for sid, matched in index.match(events).items():
+        key = tuple(id(ev) for ev in matched)
+        if key not in groups:
+            groups[key] = (render_digest(matched), [])
+        groups[key][1].append(index.emails[sid])
+    return list(groups.values())
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import base64
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from fileio import write_atomic
+
+# Response headers worth keeping; the rest describe the original transfer.
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+
+def configured():
+    """
+    (record_dir, replay_target) from the environment, read at call time:
+    HTTP_RECORD=<dir> saves every response the scrapers receive as a fixture;
+    HTTP_REPLAY=<dir> serves those fixtures instead of touching the network;
+    HTTP_REPLAY=http://host:port sends every request to a replay server
+    (`python replay.py serve <dir>`) so the real socket path is exercised.
+    """
+    return os.getenv("HTTP_RECORD", ""), os.getenv("HTTP_REPLAY", "")
+
+
+def normalize_url(url: str) -> str:
+    """Sorts the query so the same request always maps to the same fixture."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def fixture_path(directory: str, method: str, url: str) -> str:
+    key = hashlib.sha1(f"{method.upper()} {normalize_url(url)}".encode("utf-8")).hexdigest()[:20]
+    return os.path.join(directory, key + ".json")
+
+
+def save_fixture(directory, method, url, status, headers, body: bytes):
+    os.makedirs(directory, exist_ok=True)
+    record = {
+        "method": method.upper(),
+        "url": normalize_url(url),
+        "status": status,
+        "headers": {k: v for k, v in headers.items() if k in KEPT_HEADERS},
+    }
+    try:
+        record["text"] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        record["base64"] = base64.b64encode(body).decode("ascii")
+    path = fixture_path(directory, method, url)
+    write_atomic(path, json.dumps(record, ensure_ascii=False))
+    return path
+
+
+def load_fixture(directory, method, url):
+    try:
+        with open(fixture_path(directory, method, url), "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if "base64" in record:
+        record["body"] = base64.b64decode(record["base64"])
+    else:
+        record["body"] = record.get("text", "").encode("utf-8")
+    return record
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests normally and keeps each response as a fixture."""
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        save_fixture(self.directory, request.method, request.url,
+                     resp.status_code, resp.headers, resp.content)
+        return resp
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from recorded fixtures; unknown requests fail like a dead host."""
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+
+    def send(self, request, **kwargs):
+        record = load_fixture(self.directory, request.method, request.url)
+        if record is None:
+            raise requests.ConnectionError(f"no fixture for {request.method} {request.url}", request=request)
+        resp = requests.Response()
+        resp.status_code = record["status"]
+        resp.headers = CaseInsensitiveDict(record.get("headers") or {})
+        resp._content = record["body"]
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers) or "utf-8"
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "Replayed"
+        return resp
+
+    def close(self):
+        pass
+
+
+class ServerReplayAdapter(HTTPAdapter):
+    """Sends every request to a replay server, carrying the original URL in the path."""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        original = request.url
+        request.url = f"{self.base_url}/{quote(original, safe='')}"
+        try:
+            resp = super().send(request, **kwargs)
+        finally:
+            request.url = original
+        resp.url = original
+        return resp
+
+
+def install(session: requests.Session, pool_size=16):
+    """
+    Mounts the recording or replay transport on `session` when configured.
+    Returns "record", "replay" or "" so callers can adapt (e.g. skip caches).
+    """
+    record, replay = configured()
+    if replay:
+        if replay.startswith(("http://", "https://")):
+            adapter = ServerReplayAdapter(replay, pool_connections=pool_size, pool_maxsize=pool_size)
+        else:
+            adapter = ReplayAdapter(replay)
+        mode = "replay"
+    elif record:
+        adapter = RecordingAdapter(record, pool_connections=pool_size, pool_maxsize=pool_size)
+        mode = "record"
+    else:
+        return ""
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return mode
+
+
+class ReplayServer:
+    """Local HTTP server answering /<quoted original URL> from a fixture directory."""
+
+    def __init__(self, directory, host="127.0.0.1", port=0):
+        self.directory = directory
+        self.hits = 0
+        self.misses = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _answer(self, method):
+                original = unquote(self.path.lstrip("/"))
+                record = load_fixture(server.directory, method, original)
+                if record is None:
+                    server.misses.append(original)
+                    record = {"status": 404, "headers": {}, "body": b""}
+                else:
+                    server.hits += 1
+                body = record["body"]
+                self.send_response(record["status"])
+                for k, v in (record.get("headers") or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if method != "HEAD":
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._answer("GET")
+
+            def do_HEAD(self):
+                self._answer("HEAD")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recorded HTTP fixtures.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    serve = sub.add_parser("serve", help="serve a fixture directory over HTTP")
+    serve.add_argument("directory")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8799)
+    ls = sub.add_parser("list", help="list the requests a fixture directory can answer")
+    ls.add_argument("directory")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "list":
+        for name in sorted(os.listdir(args.directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(args.directory, name), "r", encoding="utf-8") as f:
+                    rec = json.load(f)
+                print(f"{rec['status']} {rec['method']} {rec['url']}")
+        return 0
+
+    server = ReplayServer(args.directory, args.host, args.port)
+    print(f"Replaying {args.directory} on {server.url} (set HTTP_REPLAY={server.url})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
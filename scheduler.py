@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import heapq
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from fileio import write_atomic
+
+NEXT_RUN_FILE = os.getenv("NEXT_RUN_FILE", "next_run.json")
+# Never poll more often than MIN_INTERVAL, and always poll at least every
+# MAX_INTERVAL so unannounced drops are still picked up.
+MIN_INTERVAL = timedelta(minutes=int(os.getenv("SCHEDULE_MIN_MINUTES", "20")))
+MAX_INTERVAL = timedelta(hours=float(os.getenv("SCHEDULE_MAX_HOURS", "8")))
+# Stores flip a little after the advertised time; wake up just after it.
+GRACE = timedelta(minutes=3)
+
+
+def parse_time(value):
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def upcoming_events(grouped: dict, now: datetime):
+    """Time-ordered (when, kind, platform, title) for every future start/expiry."""
+    heap = []
+    for platform, items in grouped.items():
+        for it in items:
+            for kind, field in (("starts", "starts_at"), ("ends", "ends_at")):
+                when = parse_time(it.get(field))
+                if when and when > now:
+                    heapq.heappush(heap, (when, kind, platform, it.get("title") or ""))
+    while heap:
+        yield heapq.heappop(heap)
+
+
+def plan_next_run(grouped: dict, now: datetime = None, source_due: dict = None) -> dict:
+    """
+    The next useful run: just after the earliest upcoming start or expiry,
+    or when a source's polling TTL (`source_due`: name -> datetime) runs
+    out, clamped to [MIN_INTERVAL, MAX_INTERVAL] from now. EGS rotations
+    start when the previous giveaway ends, so expiries also cover the next
+    start.
+    """
+    now = now or datetime.now(timezone.utc)
+    events = []
+    for ev in upcoming_events(grouped, now):
+        events.append(ev)
+        if len(events) == 10:
+            break
+    if source_due:
+        polls = [(when - GRACE, "poll", "TTL", name) for name, when in source_due.items()]
+        events = sorted(events + polls)[:10]
+    if events:
+        target = events[0][0] + GRACE
+        reason = f"{events[0][1]} of {events[0][3]} ({events[0][2]})"
+    else:
+        target = now + MAX_INTERVAL
+        reason = "no known start/expiry; regular poll"
+    target = min(max(target, now + MIN_INTERVAL), now + MAX_INTERVAL)
+    if target == now + MAX_INTERVAL and events:
+        reason = "regular poll (next event is further out)"
+    return {
+        "planned_at": now.isoformat(timespec="seconds"),
+        "next_run": target.isoformat(timespec="seconds"),
+        "reason": reason,
+        "upcoming": [
+            {"at": w.isoformat(timespec="seconds"), "kind": k, "platform": p, "title": t}
+            for w, k, p, t in events
+        ],
+    }
+
+
+def save_plan(plan: dict, path=NEXT_RUN_FILE):
+    write_atomic(path, json.dumps(plan, indent=2, ensure_ascii=False))
+
+
+def is_due(path=NEXT_RUN_FILE, now: datetime = None) -> bool:
+    """True when there is no plan yet or its next_run has passed."""
+    now = now or datetime.now(timezone.utc)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+    except (OSError, ValueError):
+        return True
+    next_run = parse_time(plan.get("next_run"))
+    return next_run is None or now >= next_run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Adaptive run gate for the notifier.")
+    parser.add_argument("--check", action="store_true",
+                        help="print due=true/false (and write it to $GITHUB_OUTPUT)")
+    parser.add_argument("--plan", metavar="GAME_DATA",
+                        help="plan the next run from a grouped snapshot such as game_data.json")
+    args = parser.parse_args(argv)
+
+    if args.plan:
+        with open(args.plan, "r", encoding="utf-8") as f:
+            plan = plan_next_run(json.load(f))
+        save_plan(plan)
+        print(f"Next run at {plan['next_run']}: {plan['reason']}")
+    if args.check or not args.plan:
+        due = is_due()
+        print(f"due={'true' if due else 'false'}")
+        out = os.getenv("GITHUB_OUTPUT")
+        if out:
+            with open(out, "a", encoding="utf-8") as f:
+                f.write(f"due={'true' if due else 'false'}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
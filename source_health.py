@@ -0,0 +1,110 @@
+import os
+import json
+import time
+
+from fileio import write_atomic
+
+SOURCE_CACHE_FILE = os.getenv("SOURCE_CACHE_FILE", "source_cache.json")
+# How long a last-known-good result may be served in place of a failed fetch.
+SOURCE_CACHE_TTL = float(os.getenv("SOURCE_CACHE_TTL", str(24 * 3600)))
+# Consecutive failures before a source's breaker opens, and how long it stays open.
+BREAKER_THRESHOLD = int(os.getenv("BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", str(6 * 3600)))
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class SourceHealth:
+    """
+    Last-known-good results plus a circuit breaker per source.
+
+    A failed fetch (exception or missed deadline) serves the cached result
+    while it is younger than SOURCE_CACHE_TTL, so a flaky site no longer
+    reads as every one of its titles expiring. After BREAKER_THRESHOLD
+    failures in a row the breaker opens and the source is not contacted
+    for BREAKER_COOLDOWN; then one trial fetch (half-open) decides whether
+    it closes again.
+    """
+
+    def __init__(self, path=SOURCE_CACHE_FILE, ttl=SOURCE_CACHE_TTL,
+                 threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.path = path
+        self.ttl = ttl
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.entries = {}
+        self.run_outcome = {}
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+        except Exception as e:
+            print(f"[HEALTH] Could not read {path}:", e)
+
+    def _entry(self, name):
+        return self.entries.setdefault(name, {
+            "items": None, "fetched_at": 0, "failures": 0,
+            "opened_at": None, "last_error": "",
+        })
+
+    def state(self, name, now=None) -> str:
+        e = self._entry(name)
+        now = now or time.time()
+        if e["opened_at"] is not None:
+            return HALF_OPEN if now - e["opened_at"] >= self.cooldown else OPEN
+        return DEGRADED if e["failures"] else HEALTHY
+
+    def should_fetch(self, name) -> bool:
+        return self.state(name) != OPEN
+
+    def cached(self, name, now=None):
+        """Returns the last good result if it is still within the TTL, else None."""
+        e = self._entry(name)
+        now = now or time.time()
+        if e["items"] is None or now - e["fetched_at"] > self.ttl:
+            return None
+        return e["items"]
+
+    def last_good(self, name):
+        """The last good result however old it is, None if there never was one."""
+        return self.entries.get(name, {}).get("items")
+
+    def last_fetched(self, name) -> float:
+        """Epoch seconds of the last successful fetch, 0 if there never was one."""
+        return self.entries.get(name, {}).get("fetched_at") or 0
+
+    def record_success(self, name, items):
+        e = self._entry(name)
+        e.update(items=items, fetched_at=time.time(), failures=0, opened_at=None, last_error="")
+        self.run_outcome[name] = "fetched"
+
+    def record_failure(self, name, error: str):
+        e = self._entry(name)
+        was_trial = self.state(name) == HALF_OPEN
+        e["failures"] += 1
+        e["last_error"] = error
+        if was_trial or e["failures"] >= self.threshold:
+            e["opened_at"] = time.time()
+        self.run_outcome[name] = "failed"
+
+    def record_skipped(self, name):
+        self.run_outcome[name] = "skipped (breaker open)"
+
+    def save(self):
+        write_atomic(self.path, json.dumps(self.entries, ensure_ascii=False))
+
+    def report(self):
+        print("[HEALTH] Source health:")
+        now = time.time()
+        for name in sorted(self.entries):
+            e = self.entries[name]
+            age = f"{(now - e['fetched_at']) / 3600:.1f}h" if e["fetched_at"] else "never"
+            outcome = self.run_outcome.get(name, "not run")
+            line = (f"  {name:<8} {self.state(name, now):<9} this run: {outcome:<22} "
+                    f"failures={e['failures']} last good={age}")
+            if e["last_error"]:
+                line += f" error={e['last_error'][:120]}"
+            print(line)
@@ -0,0 +1,151 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from fileio import write_atomic
+from metrics import METRICS
+
+# Store API base; point it at a local stub to exercise enrichment offline.
+STEAM_STORE_API = os.getenv("STEAM_STORE_API", "https://api.steampowered.com").rstrip("/")
+STEAM_APP_CACHE = os.getenv("STEAM_APP_CACHE", "steam_app_cache.json")
+# Metadata is refetched after this long, or once a known discount has ended.
+STEAM_APP_TTL = float(os.getenv("STEAM_APP_TTL", str(24 * 3600)))
+# Appids per GetItems call, and calls in flight at once.
+STEAM_BATCH_SIZE = int(os.getenv("STEAM_BATCH_SIZE", "50"))
+STEAM_WORKERS = int(os.getenv("STEAM_WORKERS", "3"))
+STEAM_COUNTRY = os.getenv("STEAM_COUNTRY", "IN")
+
+ASSET_BASE = "https://shared.akamai.steamstatic.com/store_item_assets/"
+# EStoreAppType values worth naming on a card.
+APP_TYPES = {0: "game", 1: "demo", 2: "mod", 3: "movie", 4: "dlc", 6: "software", 11: "music"}
+
+
+def _iso(ts) -> str:
+    return datetime.fromtimestamp(int(ts), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_store_item(item: dict) -> dict:
+    """The fields we keep from one IStoreBrowseService/GetItems store_item."""
+    meta = {"name": item.get("name") or "", "type": APP_TYPES.get(item.get("type"), "other")}
+
+    assets = item.get("assets") or {}
+    fmt = assets.get("asset_url_format")
+    if fmt and assets.get("header"):
+        meta["header"] = ASSET_BASE + fmt.replace("${FILENAME}", assets["header"])
+
+    ends = [d.get("discount_end_date") for d in
+            ((item.get("best_purchase_option") or {}).get("active_discounts") or [])
+            if d.get("discount_end_date")]
+    if ends:
+        meta["ends_at"] = _iso(min(int(e) for e in ends))
+    return meta
+
+
+def items_params(appids, country=STEAM_COUNTRY) -> dict:
+    """Query for one GetItems call: the request travels as JSON in input_json."""
+    request = {
+        "ids": [{"appid": int(a)} for a in appids],
+        "context": {"language": "english", "country_code": country},
+        "data_request": {"include_assets": True, "include_basic_info": True},
+    }
+    return {"input_json": json.dumps(request, separators=(",", ":"))}
+
+
+class SteamStore:
+    """
+    Steam store metadata (header image, app type, discount end) per appid.
+
+    Lookups go through a JSON cache keyed by appid. Only appids that are
+    new, older than `ttl` or whose recorded discount has ended are asked
+    for, in GetItems calls of `batch_size` ids with at most `workers` in
+    flight; appids the store does not know are cached too, so they are
+    not asked for again until the TTL runs out. A failed call leaves its
+    appids uncached and the items as they were.
+    """
+
+    def __init__(self, http, path=STEAM_APP_CACHE, ttl=STEAM_APP_TTL, base_url=STEAM_STORE_API,
+                 batch_size=STEAM_BATCH_SIZE, workers=STEAM_WORKERS, country=STEAM_COUNTRY):
+        self.http = http
+        self.path = path
+        self.ttl = ttl
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.workers = workers
+        self.country = country
+        self.apps = {}
+        self.dirty = False
+        try:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self.apps = json.load(f)
+        except Exception as e:
+            print(f"[STEAM] Could not read {path}:", e)
+
+    def _fresh(self, entry, now) -> bool:
+        if now - entry.get("fetched_at", 0) >= self.ttl:
+            return False
+        ends_at = entry.get("ends_at")
+        return not ends_at or ends_at > _iso(now)
+
+    def _fetch_batch(self, appids):
+        resp = self.http.get(f"{self.base_url}/IStoreBrowseService/GetItems/v1",
+                             params=items_params(appids, self.country), timeout=20, use_cache=False)
+        resp.raise_for_status()
+        found = {}
+        for item in (resp.json().get("response") or {}).get("store_items") or []:
+            appid = item.get("appid", item.get("id"))
+            if appid is not None and item.get("success", 1) == 1:
+                found[str(appid)] = parse_store_item(item)
+        return found
+
+    def lookup(self, appids, now=None) -> dict:
+        """{appid: metadata} for every appid, fetching only what the cache lacks."""
+        now = now or time.time()
+        wanted = list(dict.fromkeys(str(a) for a in appids if a))
+        stale = [a for a in wanted if a not in self.apps or not self._fresh(self.apps[a], now)]
+        METRICS.count("steam_app_cache_hits", len(wanted) - len(stale))
+        batches = [stale[i:i + self.batch_size] for i in range(0, len(stale), self.batch_size)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="steam-store") as pool:
+                results = pool.map(METRICS.carry_source(self._try_batch), batches)
+                for batch, found in zip(batches, results):
+                    if found is None:
+                        continue
+                    for appid in batch:
+                        entry = found.get(appid, {"missing": True})
+                        entry["fetched_at"] = now
+                        self.apps[appid] = entry
+                    self.dirty = True
+            print(f"[STEAM] Store metadata: {len(wanted) - len(stale)} cached, "
+                  f"{len(stale)} fetched in {len(batches)} call(s)")
+        return {a: self.apps[a] for a in wanted if a in self.apps and not self.apps[a].get("missing")}
+
+    def _try_batch(self, batch):
+        try:
+            return self._fetch_batch(batch)
+        except Exception as e:
+            print(f"[STEAM] GetItems failed for {len(batch)} appid(s): {e}")
+            return None
+
+    def enrich(self, items, now=None):
+        """Fills banner, ends_at and app_type on Steam items that carry an appid."""
+        now = now or time.time()
+        meta = self.lookup((it.get("appid") for it in items), now)
+        for it in items:
+            m = meta.get(str(it.get("appid") or ""))
+            if not m:
+                continue
+            if not it.get("banner") and m.get("header"):
+                it["banner"] = m["header"]
+            if not it.get("ends_at") and m.get("ends_at", "") > _iso(now):
+                it["ends_at"] = m["ends_at"]
+            it["app_type"] = m.get("type") or "other"
+        return items
+
+    def save(self):
+        if not self.dirty:
+            return
+        write_atomic(self.path, json.dumps(self.apps, ensure_ascii=False, separators=(",", ":")))
+        self.dirty = False
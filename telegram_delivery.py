@@ -0,0 +1,166 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ratelimit import TokenBucket
+
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+TELEGRAM_MAX_CHARS = 4096
+# Bot API limits: ~30 messages/s overall, ~1 message/s into one chat.
+GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+PER_CHAT_RATE = float(os.getenv("TELEGRAM_PER_CHAT_RATE", "1"))
+MAX_ATTEMPTS = 5
+
+
+def utf16_len(text: str) -> int:
+    """Telegram measures message length in UTF-16 code units."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def split_message(text: str, limit: int = TELEGRAM_MAX_CHARS):
+    """
+    Packs the lines of `text` into as few messages as possible, each at most
+    `limit` UTF-16 units. Change-log lines carry complete HTML tags, so
+    splitting on line boundaries never breaks markup; a single line that is
+    too long on its own is hard-split.
+    """
+    chunks, current, size = [], [], 0
+    for line in text.split("\n"):
+        n = utf16_len(line)
+        while n > limit:
+            cut = limit
+            while utf16_len(line[:cut]) > limit:
+                cut -= 1
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.append(line[:cut])
+            line = line[cut:]
+            n = utf16_len(line)
+        extra = n + (1 if current else 0)
+        if current and size + extra > limit:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+            extra = n
+        current.append(line)
+        size += extra
+    if current:
+        chunks.append("\n".join(current))
+    return [c for c in chunks if c.strip()]
+
+
+class TelegramDelivery:
+    """
+    Delivers HTML messages to many chats over a pooled session. Meant to be
+    kept for the life of the process: the session and the rate limits carry
+    over from one broadcast to the next, while `stats` covers the last one.
+
+    - a global and a per-chat token bucket keep under the Bot API limits
+    - 429 answers wait for `parameters.retry_after`; 5xx and connection
+      errors back off with jitter; other 4xx fail that chat immediately
+    - long messages are split to the 4096-unit limit and sent in order
+    - chats are served concurrently; per-message latency and overall
+      throughput are collected in `stats`
+    """
+
+    def __init__(self, token, chat_ids, api_base=TELEGRAM_API_BASE,
+                 global_rate=GLOBAL_RATE, per_chat_rate=PER_CHAT_RATE, workers=8):
+        self.url = f"{api_base.rstrip('/')}/bot{token}/sendMessage"
+        self.chat_ids = list(chat_ids)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.global_bucket = TokenBucket(global_rate)
+        self.per_chat_rate = per_chat_rate
+        self.chat_buckets = {}
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.stats = {"sent": 0, "failed": 0, "retries": 0, "latencies": []}
+
+    def _chat_bucket(self, chat_id):
+        with self.lock:
+            if chat_id not in self.chat_buckets:
+                self.chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, 1)
+            return self.chat_buckets[chat_id]
+
+    def _count(self, key, latency=None):
+        with self.lock:
+            self.stats[key] += 1
+            if latency is not None:
+                self.stats["latencies"].append(latency)
+
+    def send_one(self, chat_id, text) -> bool:
+        payload = {
+            "chat_id": chat_id,
+            "text": text,
+            "parse_mode": "HTML",
+            "disable_web_page_preview": True,
+        }
+        started = time.monotonic()
+        for attempt in range(MAX_ATTEMPTS):
+            self._chat_bucket(chat_id).acquire()
+            self.global_bucket.acquire()
+            try:
+                resp = self.session.post(self.url, data=payload, timeout=10)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                print(f"[TELEGRAM] {chat_id}: {e}")
+                resp = None
+
+            if resp is not None and resp.status_code == 200:
+                self._count("sent", time.monotonic() - started)
+                return True
+
+            if resp is not None and resp.status_code == 429:
+                try:
+                    delay = float(resp.json().get("parameters", {}).get("retry_after", 1))
+                except ValueError:
+                    delay = 1.0
+            elif resp is None or resp.status_code >= 500:
+                delay = random.uniform(0, min(30, 2 ** attempt))
+            else:
+                print(f"[TELEGRAM] {chat_id}: HTTP {resp.status_code} {resp.text[:300]}")
+                break
+
+            if attempt + 1 < MAX_ATTEMPTS:
+                self._count("retries")
+                time.sleep(delay)
+        self._count("failed")
+        return False
+
+    def _deliver_to_chat(self, chat_id, chunks) -> bool:
+        for chunk in chunks:
+            if not self.send_one(chat_id, chunk):
+                return False
+        return True
+
+    def broadcast(self, text):
+        """Sends `text` to every chat; returns {chat_id: delivered?}."""
+        chunks = split_message(text)
+        with self.lock:
+            self.stats = {"sent": 0, "failed": 0, "retries": 0, "latencies": []}
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="telegram") as pool:
+            outcome = dict(zip(self.chat_ids, pool.map(lambda c: self._deliver_to_chat(c, chunks), self.chat_ids)))
+        self.stats["elapsed"] = time.monotonic() - started
+        self.stats["chunks"] = len(chunks)
+        return outcome
+
+    def report(self):
+        lat = sorted(self.stats["latencies"])
+        elapsed = self.stats.get("elapsed") or 0
+        rate = self.stats["sent"] / elapsed if elapsed else 0.0
+
+        def pct(p):
+            return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else 0.0
+
+        print(
+            f"[TELEGRAM] chats={len(self.chat_ids)} chunks={self.stats.get('chunks', 0)} "
+            f"sent={self.stats['sent']} failed={self.stats['failed']} retries={self.stats['retries']} "
+            f"throughput={rate:.1f} msg/s latency p50={pct(0.5):.0f}ms p95={pct(0.95):.0f}ms"
+        )
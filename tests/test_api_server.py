@@ -0,0 +1,27 @@
+from api_server import Snapshot, append_change_set
+
+
+def snapshot(version, keep=5):
+    log = {}
+    for _ in range(version):
+        log = append_change_set(log, [], "2026-01-01T00:00:00Z", keep=keep)
+    return Snapshot(log.get("version", 0), {}, log.get("sets", []))
+
+
+def test_changes_after_a_known_cursor():
+    snap = snapshot(7)
+    assert [s["version"] for s in snap.changes_since(5)["changes"]] == [6, 7]
+    assert snap.changes_since(7) == {"version": 7, "changes": []}
+
+
+def test_cursor_older_than_the_ring_buffer_resets():
+    assert snapshot(7, keep=3).changes_since(2)["reset"] is True
+
+
+def test_cursor_ahead_of_the_version_resets():
+    # The change log was lost and counting started over.
+    assert snapshot(1).changes_since(5) == {"version": 1, "reset": True, "changes": []}
+
+
+def test_negative_cursor_resets():
+    assert snapshot(2).changes_since(-1)["reset"] is True
@@ -0,0 +1,47 @@
+from duplicates import link_duplicates
+
+ORDER = ["Epic Games Store", "Prime Gaming", "Steam", "GOG", "Humble", "Ubisoft"]
+
+
+def item(platform, title, link):
+    return {"platform": platform, "title": title, "link": link, "banner": ""}
+
+
+def test_same_game_on_two_stores_is_one_drop():
+    gog = item("GOG", "Right and Down", "https://www.gog.com/game/right_and_down")
+    prime = item("Prime Gaming", "Right and Down", "https://gaming.amazon.com/claims/right-and-down-gog/dp/1")
+    stats = {}
+    kept = link_duplicates([prime, gog], stats, ORDER)
+    # The Prime claim redeems on GOG, so the GOG listing is the one kept.
+    assert kept == [gog]
+    assert [c["platform"] for c in gog["claim_links"]] == ["GOG", "Prime Gaming"]
+    assert stats["cross_platform"] == 1
+
+
+def test_sequel_numbers_keep_games_apart():
+    items = [
+        item("Epic Games Store", "Shadow Tactics 2", "https://e/2"),
+        item("GOG", "Shadow Tactics 3", "https://g/3"),
+        item("Steam", "Shadow Tactics", "https://s/1"),
+    ]
+    kept = link_duplicates(items, {}, ORDER)
+    assert len(kept) == 3
+    assert not any(it.get("claim_links") for it in kept)
+
+
+def test_one_listing_per_platform_in_a_cluster():
+    items = [item("GOG", "Right and Down", "https://g/1"), item("GOG", "Right and Down", "https://g/2")]
+    assert len(link_duplicates(items, {}, ORDER)) == 2
+
+
+def test_headline_mentioning_a_game_is_folded_into_it():
+    epic = item("Epic Games Store", "Assassin's Creed Origins", "https://e/ac")
+    ubi = item("Ubisoft", "Claim Assassin's Creed Origins for free", "https://u/1")
+    assert link_duplicates([ubi, epic], {}, ORDER) == [epic]
+    assert [c["platform"] for c in epic["claim_links"]] == ["Epic Games Store", "Ubisoft"]
+
+
+def test_headline_does_not_match_a_numbered_sequel():
+    game = item("Epic Games Store", "Far Cry", "https://e/fc")
+    ubi = item("Ubisoft", "Claim Far Cry 3 for free", "https://u/3")
+    assert len(link_duplicates([ubi, game], {}, ORDER)) == 2
@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+from xml.dom import minidom
+
+import feeds
+
+BASE = "https://example.com/"
+
+
+def entries(image):
+    event = {"event": "new", "key": "GOG|https://g/x", "platform": "GOG", "title": "Game",
+             "line": "<b>GOG</b> – Game", "link": "https://g/x", "image": image}
+    return feeds.merge_entries([], [event], datetime(2026, 1, 1, tzinfo=timezone.utc), BASE)
+
+
+def test_atom_feed_has_an_author():
+    doc = minidom.parseString(feeds.render_atom(entries(""), BASE))
+    author = doc.documentElement.getElementsByTagName("author")
+    assert author and author[0].getElementsByTagName("name")[0].firstChild.data == feeds.FEED_AUTHOR
+
+
+def test_rss_enclosure_type_follows_the_image():
+    doc = minidom.parseString(feeds.render_rss(entries("https://cdn/x.webp?v=2"), BASE))
+    assert doc.getElementsByTagName("enclosure")[0].getAttribute("type") == "image/webp"
+
+
+def test_rss_leaves_out_enclosures_of_unknown_type():
+    doc = minidom.parseString(feeds.render_rss(entries("https://cdn/banner"), BASE))
+    assert doc.getElementsByTagName("enclosure") == []
@@ -0,0 +1,47 @@
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_client import HttpClient, call_deadline
+
+
+@pytest.fixture
+def hanging_server():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(5)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_deadline_caps_all_attempts(hanging_server, tmp_path):
+    client = HttpClient(cache_dir=str(tmp_path))
+    started = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        client.get(hanging_server, timeout=20, deadline=started + 0.5)
+    assert time.monotonic() - started < 2
+
+
+def test_call_deadline_applies_without_an_argument(hanging_server, tmp_path):
+    client = HttpClient(cache_dir=str(tmp_path))
+    started = time.monotonic()
+    with call_deadline(started + 0.5), pytest.raises(requests.Timeout):
+        client.get(hanging_server, timeout=20)
+    assert time.monotonic() - started < 2
+
+
+def test_passed_deadline_makes_no_request(tmp_path):
+    client = HttpClient(cache_dir=str(tmp_path))
+    with pytest.raises(requests.Timeout, match="deadline passed"):
+        client.get("http://127.0.0.1:9/", deadline=time.monotonic() - 1)
@@ -0,0 +1,48 @@
+import pytest
+
+import main
+
+HUMBLE = ('<html><body><main><div class="entity-block-container js-entity-block"><a href="/store/x">'
+          '<img src="https://i/x.jpg"><span class="entity-title">Humble Game</span>'
+          '<span class="discount-amount">-100%</span><span class="promo-timer">2 days left</span>'
+          '</a></div></main></body></html>')
+STEAM = ('<html><body><table><tr class="app appimg" data-appid="10"><td>x</td></tr>'
+         '<tr class="other" data-appid="11"><td>y</td></tr></table></body></html>')
+
+
+def test_has_class_matches_one_token():
+    match = main.has_class("app")
+    assert match("app")
+    assert match("app appimg")
+    assert match(["appimg", "app"])
+    assert not match("application")
+    assert not match(None)
+
+
+def test_strainer_keeps_elements_with_extra_classes():
+    rows = main.make_soup(STEAM, main.STEAM_ROWS).select("tr")
+    assert [r["data-appid"] for r in rows] == ["10"]
+
+
+def test_strained_parse_matches_full_parse(monkeypatch):
+    strained, _ = main.parse_humble(HUMBLE)
+    monkeypatch.setattr(main, "PARSE_ONLY", False)
+    full, _ = main.parse_humble(HUMBLE)
+    assert [it["title"] for it in strained] == ["Humble Game"]
+    assert [(it["title"], it["link"]) for it in strained] == [(it["title"], it["link"]) for it in full]
+
+
+class ShellResponse:
+    text = "<html><body><div id='root'></div><script src='app.js'></script></body></html>"
+
+    def raise_for_status(self):
+        pass
+
+
+def test_prime_fails_when_browser_failed_and_fallback_has_no_cards(monkeypatch):
+    def broken(url):
+        raise RuntimeError("browser crashed")
+    monkeypatch.setattr(main.PRIME, "fetch_html", broken)
+    monkeypatch.setattr(main.HTTP, "get", lambda *a, **k: ShellResponse())
+    with pytest.raises(RuntimeError, match="browser crashed"):
+        main.get_prime_free()
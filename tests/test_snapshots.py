@@ -0,0 +1,69 @@
+import pytest
+
+import main
+from history import HistoryStore
+from source_health import SourceHealth
+
+PRIME = {"platform": "Prime Gaming", "title": "Right and Down", "status": "Free", "banner": "",
+         "link": "https://gaming.amazon.com/claims/right-and-down-gog/dp/1"}
+GOG = {"platform": "GOG", "title": "Right and Down", "status": "Free", "banner": "",
+       "link": "https://www.gog.com/game/right_and_down"}
+
+
+def grouped(prime=False, gog=False):
+    results = {}
+    if prime:
+        results["prime"] = ([dict(PRIME)], [])
+    if gog:
+        results["gog"] = [dict(GOG)]
+    return main.build_grouped(results)
+
+
+@pytest.fixture(autouse=True)
+def history_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "HISTORY_DB", str(tmp_path / "history.db"))
+    monkeypatch.setattr(main, "ARCHIVE_FILE", str(tmp_path / "monthly_archive.json"))
+    return tmp_path / "history.db"
+
+
+def test_folding_a_live_listing_is_not_an_expiry():
+    before, after = grouped(prime=True), grouped(prime=True, gog=True)
+    assert list(after) == ["GOG"]
+    changes, _ = main.compare_and_build(before, after)
+    assert changes == ["🟢 New Freebie: <b>GOG</b> – Right and Down (also on Prime Gaming)"]
+
+
+def test_unfolding_a_listing_is_not_new():
+    changes, _ = main.compare_and_build(grouped(prime=True, gog=True), grouped(prime=True))
+    assert changes == ["🔻 Expired: <b>GOG</b> – Right and Down (also on Prime Gaming)"]
+
+
+def test_history_seeds_drops_that_were_already_live(history_db):
+    live = grouped(gog=True)
+    main.compare_and_build(live, live)
+    store = HistoryStore(str(history_db))
+    try:
+        assert [r["title"] for r in store.active()] == ["Right and Down"]
+    finally:
+        store.close()
+
+
+def test_history_closes_a_folded_listing_that_went_away(history_db):
+    main.compare_and_build({}, grouped(prime=True))
+    main.compare_and_build(grouped(prime=True), grouped(prime=True, gog=True))
+    main.compare_and_build(grouped(prime=True, gog=True), {})
+    store = HistoryStore(str(history_db))
+    try:
+        assert store.active() == []
+    finally:
+        store.close()
+
+
+def test_unfetched_sources_come_from_raw_cached_results(tmp_path):
+    health = SourceHealth(path=str(tmp_path / "source_cache.json"))
+    health.record_success("prime", ([dict(PRIME)], []))
+    snapshot = grouped(prime=True, gog=True)
+    # The snapshot only has the folded GOG drop; the Prime listing is in the cache.
+    results = main.snapshot_results(snapshot, ["prime", "gog"], health)
+    assert results["prime"] == ([PRIME], [])
+    assert [it.get("claim_links") for it in results["gog"]] == [None]